@@ -1,15 +1,34 @@
 import asyncio
-from typing import Any, Dict, List, Mapping, Optional, Self, Set, Type, Union, cast
+import json
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Self,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 
 import aio_pika.abc
-from aleph_message.models import Chain, ItemHash, ItemType, MessageType, StoreContent
+from aleph_message.models import Chain, ItemHash, ItemType, MessageType
 from configmanager import Config
 from pydantic import ValidationError
+from sqlalchemy.engine import Row
 
+import aleph.toolkit.json as aleph_json
 from aleph.chains.common import LOGGER
 from aleph.config import get_config
 from aleph.db.accessors.chains import upsert_chain_tx
-from aleph.db.accessors.files import upsert_file, upsert_tx_file_pin
+from aleph.db.accessors.files import upsert_files, upsert_tx_file_pins
 from aleph.db.accessors.pending_txs import upsert_pending_tx
 from aleph.db.models import ChainTxDb, MessageDb
 from aleph.exceptions import (
@@ -18,12 +37,7 @@ from aleph.exceptions import (
     InvalidContent,
 )
 from aleph.schemas.chains.indexer_response import GenericMessageEvent, MessageEvent
-from aleph.schemas.chains.sync_events import (
-    OffChainSyncEventPayload,
-    OnChainContent,
-    OnChainMessage,
-    OnChainSyncEventPayload,
-)
+from aleph.schemas.chains.sync_events import OffChainSyncEventPayload
 from aleph.schemas.chains.tezos_indexer_response import (
     MessageEventPayload as TezosMessageEventPayload,
 )
@@ -32,7 +46,47 @@ from aleph.toolkit.timestamp import utc_now
 from aleph.types.chain_sync import ChainSyncProtocol
 from aleph.types.db_session import DbSession, DbSessionFactory
 from aleph.types.files import FileType
-from aleph.utils import get_sha256
+from aleph.utils import get_sha256, run_in_executor
+
+# Maximum number of IPFS pins of sync files running in the background.
+MAX_PENDING_PIN_TASKS = 256
+# Maximum number of rows inserted per statement when flushing tx file pins.
+FILE_PINS_BATCH_SIZE = 128
+
+# Sync archives with more messages than this are encoded in a thread.
+SYNC_ARCHIVE_EXECUTOR_THRESHOLD = 256
+
+# Messages to include in a sync archive, as ORM objects or rows with the same columns.
+SyncMessage = Union[MessageDb, Row]
+
+# (file hash, file size, tx hash)
+PendingFilePin = Tuple[str, int, str]
+
+
+@lru_cache(maxsize=4096)
+def _make_store_ipfs_item_content(
+    address: str, time: float, ipfs_hash: str
+) -> Tuple[str, str]:
+    """
+    Builds the item content of a STORE message emitted by a smart contract, along with
+    its hash.
+
+    The same event can be seen several times (ex: when a pending tx is retried),
+    so we cache the result to avoid serializing and hashing the same content again.
+
+    The content has a fixed shape, so we serialize it directly instead of going through
+    `StoreContent(...).json(exclude_none=True)`. The output must remain byte-for-byte
+    identical to the pydantic one as it determines the item hash of the message:
+    keep the field order and the default separators of `json.dumps`.
+    """
+    content = {
+        "address": address,
+        "time": float(time),
+        "item_type": ItemType.ipfs.value,
+        "item_hash": ItemHash(ipfs_hash),
+    }
+    item_content = json.dumps(content)
+    return item_content, get_sha256(item_content)
 
 
 class ChainDataService:
@@ -44,8 +98,49 @@ class ChainDataService:
         self.session_factory = session_factory
         self.storage_service = storage_service
 
+        # References to the background pin tasks, to avoid them being garbage collected.
+        self._pin_tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def _make_on_chain_message_dict(message: SyncMessage) -> Dict[str, Any]:
+        """
+        Projects a message on the fields of `OnChainMessage`.
+
+        Equivalent to `OnChainMessage.from_orm(message).dict()`, but reads the attributes
+        directly to avoid validating again thousands of already processed messages.
+        Works both with `MessageDb` objects and rows returned by
+        `get_unconfirmed_message_rows`.
+        """
+        return {
+            "sender": message.sender,
+            "chain": message.chain.value,
+            "signature": message.signature,
+            "type": message.type.value,
+            "item_content": message.item_content,
+            "item_type": message.item_type.value,
+            "item_hash": message.item_hash,
+            "time": message.time.timestamp(),
+            "channel": message.channel,
+        }
+
+    @classmethod
+    def _make_sync_archive(cls, messages: Sequence[SyncMessage]) -> bytes:
+        # In previous versions, it was envisioned to store messages on-chain. This proved to be
+        # too expensive. The archive uses the same format as these "on-chain" data.
+        # The archive follows the `OnChainSyncEventPayload` schema.
+        archive = {
+            "protocol": ChainSyncProtocol.ON_CHAIN_SYNC.value,
+            "version": 1,
+            "content": {
+                "messages": [
+                    cls._make_on_chain_message_dict(message) for message in messages
+                ]
+            },
+        }
+        return aleph_json.dumps(archive)
+
     async def prepare_sync_event_payload(
-        self, session: DbSession, messages: List[MessageDb]
+        self, session: DbSession, messages: Sequence[SyncMessage]
     ) -> OffChainSyncEventPayload:
         """
         Returns the payload of a sync event to be published on chain.
@@ -60,16 +155,14 @@ class ChainDataService:
         here. This is left upon the caller once the event is successfully emitted on chain to avoid
         persisting unused archives.
         """
-        # In previous versions, it was envisioned to store messages on-chain. This proved to be
-        # too expensive. The archive uses the same format as these "on-chain" data.
-        archive = OnChainSyncEventPayload(
-            protocol=ChainSyncProtocol.ON_CHAIN_SYNC,
-            version=1,
-            content=OnChainContent(
-                messages=[OnChainMessage.from_orm(message) for message in messages]
-            ),
-        )
-        archive_content: bytes = archive.json().encode("utf-8")
+        # Encoding thousands of messages can block the event loop for a while.
+        # The messages are already loaded, the thread does not access the session.
+        if len(messages) > SYNC_ARCHIVE_EXECUTOR_THRESHOLD:
+            archive_content = await run_in_executor(
+                None, self._make_sync_archive, messages
+            )
+        else:
+            archive_content = self._make_sync_archive(messages)
 
         ipfs_cid = await self.storage_service.add_file(
             session=session, file_content=archive_content, engine=ItemType.ipfs
@@ -78,6 +171,98 @@ class ChainDataService:
             protocol=ChainSyncProtocol.OFF_CHAIN_SYNC, version=1, content=ipfs_cid
         )
 
+    def _flush_file_pins(self, pending_file_pins: Sequence[PendingFilePin]) -> None:
+        """
+        Inserts the files and tx file pins of sync files in a single transaction,
+        using one multi-row statement per table for every `FILE_PINS_BATCH_SIZE` entries.
+        """
+        if not pending_file_pins:
+            return
+
+        created = utc_now()
+        with self.session_factory() as session:
+            for i in range(0, len(pending_file_pins), FILE_PINS_BATCH_SIZE):
+                batch = pending_file_pins[i : i + FILE_PINS_BATCH_SIZE]
+                # Some chain data files are duplicated, and can be treated in parallel,
+                # hence the upsert.
+                upsert_files(
+                    session=session,
+                    files=[
+                        (file_hash, file_size, FileType.FILE)
+                        for file_hash, file_size, _ in batch
+                    ],
+                )
+                upsert_tx_file_pins(
+                    session=session,
+                    tx_file_pins=[
+                        (file_hash, tx_hash, created) for file_hash, _, tx_hash in batch
+                    ],
+                )
+            session.commit()
+
+    def _flush_tx_file_pins(
+        self, tx_file_pins: Mapping[str, Sequence[PendingFilePin]]
+    ) -> Dict[str, Exception]:
+        """
+        Inserts the file pins of several txs at once. If this fails, inserts them
+        tx by tx so that a bad row only affects its own tx.
+
+        :return: The insertion errors, by tx hash.
+        """
+        try:
+            self._flush_file_pins(
+                [
+                    file_pin
+                    for file_pins in tx_file_pins.values()
+                    for file_pin in file_pins
+                ]
+            )
+            return {}
+        except Exception as e:
+            if len(tx_file_pins) == 1:
+                return {tx_hash: e for tx_hash in tx_file_pins}
+
+            LOGGER.warning(
+                "Failed to insert the file pins of %d txs at once, inserting them "
+                "tx by tx - error: %s",
+                len(tx_file_pins),
+                str(e),
+            )
+
+        errors = {}
+        for tx_hash, file_pins in tx_file_pins.items():
+            try:
+                self._flush_file_pins(file_pins)
+            except Exception as e:
+                errors[tx_hash] = e
+
+        return errors
+
+    async def _pin_sync_file(self, file_hash: str) -> None:
+        try:
+            # Some IPFS fetches can take a while, hence the large timeout.
+            await asyncio.wait_for(
+                self.storage_service.pin_hash(file_hash), timeout=120
+            )
+        except asyncio.TimeoutError:
+            LOGGER.warning(f"Can't pin hash {file_hash}")
+        except Exception:
+            LOGGER.exception("Error while pinning sync file %s", file_hash)
+
+    async def _schedule_sync_file_pin(self, file_hash: str) -> None:
+        """
+        Pins a sync file on IPFS in the background.
+
+        Pinning is not required to process the messages of the file, and can take up to
+        a few minutes. Waits for a pin to complete if too many are already in progress.
+        """
+        if len(self._pin_tasks) >= MAX_PENDING_PIN_TASKS:
+            await asyncio.wait(self._pin_tasks, return_when=asyncio.FIRST_COMPLETED)
+
+        pin_task = asyncio.create_task(self._pin_sync_file(file_hash))
+        self._pin_tasks.add(pin_task)
+        pin_task.add_done_callback(self._pin_tasks.discard)
+
     @staticmethod
     def _get_sync_messages(tx_content: Mapping[str, Any]):
         return tx_content["messages"]
@@ -90,7 +275,10 @@ class ChainDataService:
         return messages
 
     async def _get_tx_messages_off_chain_protocol(
-        self, tx: ChainTxDb, seen_ids: Optional[Set[str]] = None
+        self,
+        tx: ChainTxDb,
+        seen_ids: Optional[Set[str]] = None,
+        pending_file_pins: Optional[List[PendingFilePin]] = None,
     ) -> List[Dict[str, Any]]:
         config = get_config()
 
@@ -117,38 +305,32 @@ class ChainDataService:
             LOGGER.exception("%s", error_msg)
             raise ContentCurrentlyUnavailable(error_msg) from e
 
+        # The sync file was already decoded by the storage service, only check its shape.
+        error_msg = f"Got bad data in offchain object {file_hash}"
         try:
-            messages = self._get_sync_messages(sync_file_content.value["content"])
-        except AlephStorageException:
-            LOGGER.debug("Got no message")
-            raise
+            messages = sync_file_content.value["content"]["messages"]
+        except (KeyError, TypeError) as e:
+            LOGGER.info("%s", error_msg)
+            raise InvalidContent(error_msg) from e
+
+        if not isinstance(messages, list):
+            LOGGER.info("%s", error_msg)
+            raise InvalidContent(error_msg)
 
         LOGGER.info("Got bulk data with %d items" % len(messages))
         if config.ipfs.enabled.value:
-            try:
-                with self.session_factory() as session:
-                    # Some chain data files are duplicated, and can be treated in parallel,
-                    # hence the upsert.
-                    upsert_file(
-                        session=session,
-                        file_hash=sync_file_content.hash,
-                        file_type=FileType.FILE,
-                        size=len(sync_file_content.raw_value),
-                    )
-                    upsert_tx_file_pin(
-                        session=session,
-                        file_hash=file_hash,
-                        tx_hash=tx.hash,
-                        created=utc_now(),
-                    )
-                    session.commit()
+            file_pin = (
+                sync_file_content.hash,
+                len(sync_file_content.raw_value),
+                tx.hash,
+            )
+            if pending_file_pins is None:
+                self._flush_file_pins([file_pin])
+            else:
+                # Inserted by the caller, along with the file pins of other txs
+                pending_file_pins.append(file_pin)
+            await self._schedule_sync_file_pin(file_hash)
 
-                # Some IPFS fetches can take a while, hence the large timeout.
-                await asyncio.wait_for(
-                    self.storage_service.pin_hash(file_hash), timeout=120
-                )
-            except asyncio.TimeoutError:
-                LOGGER.warning(f"Can't pin hash {file_hash}")
         return messages
 
     @staticmethod
@@ -182,32 +364,33 @@ class ChainDataService:
 
         if message_type == "STORE_IPFS":
             message_type = MessageType.store.value
-            content = StoreContent(
+            item_content, item_hash = _make_store_ipfs_item_content(
                 address=payload.address,
                 time=payload.timestamp_seconds,
-                item_type=ItemType.ipfs,
-                item_hash=ItemHash(payload.content),
-                metadata=None,
+                ipfs_hash=payload.content,
             )
-            item_content = content.json(exclude_none=True)
         else:
             item_content = payload.content
+            item_hash = get_sha256(item_content)
 
-        message_dict["item_hash"] = get_sha256(item_content)
+        message_dict["item_hash"] = item_hash
         message_dict["type"] = message_type
         message_dict["item_content"] = item_content
 
         return [message_dict]
 
     async def get_tx_messages(
-        self, tx: ChainTxDb, seen_ids: Optional[Set[str]] = None
+        self,
+        tx: ChainTxDb,
+        seen_ids: Optional[Set[str]] = None,
+        pending_file_pins: Optional[List[PendingFilePin]] = None,
     ) -> List[Dict[str, Any]]:
         match tx.protocol, tx.protocol_version:
             case ChainSyncProtocol.ON_CHAIN_SYNC, 1:
                 return self._get_tx_messages_on_chain_protocol(tx)
             case ChainSyncProtocol.OFF_CHAIN_SYNC, 1:
                 return await self._get_tx_messages_off_chain_protocol(
-                    tx=tx, seen_ids=seen_ids
+                    tx=tx, seen_ids=seen_ids, pending_file_pins=pending_file_pins
                 )
             case ChainSyncProtocol.SMART_CONTRACT, 1:
                 return self._get_tx_messages_smart_contract_protocol(tx)
@@ -219,6 +402,78 @@ class ChainDataService:
                 LOGGER.info("%s", error_msg)
                 raise InvalidContent(error_msg)
 
+    async def iter_tx_messages(
+        self,
+        txs: Iterable[ChainTxDb],
+        max_concurrency: int = 16,
+        seen_ids: Optional[Set[str]] = None,
+    ) -> AsyncIterator[Tuple[ChainTxDb, Union[List[Dict[str, Any]], BaseException]]]:
+        """
+        Yields the messages of multiple txs as soon as they are available, fetching
+        off-chain sync files concurrently.
+
+        Errors are yielded instead of being raised so that a single failing tx does not
+        interrupt the other ones. Off-chain txs pointing to the same sync file only fetch
+        it once: the `seen_ids` set is shared between all the txs, and is only accessed
+        from the event loop. The file pins of the sync files fetched at the same time are
+        inserted in the DB together, before their txs are yielded. A tx whose file pins
+        cannot be inserted is yielded with the error.
+
+        :param txs: The txs to process.
+        :param max_concurrency: Maximum number of txs fetched at the same time.
+        :param seen_ids: Sync file hashes already processed by the caller, if any.
+        """
+        if seen_ids is None:
+            seen_ids = set()
+
+        txs_iterator = iter(txs)
+        running_tasks: Dict[asyncio.Task, Tuple[ChainTxDb, List[PendingFilePin]]] = {}
+
+        def _start_next_tx() -> None:
+            tx = next(txs_iterator, None)
+            if tx is None:
+                return
+
+            file_pins: List[PendingFilePin] = []
+            task = asyncio.create_task(
+                self.get_tx_messages(
+                    tx=tx, seen_ids=seen_ids, pending_file_pins=file_pins
+                )
+            )
+            running_tasks[task] = (tx, file_pins)
+
+        for _ in range(max_concurrency):
+            _start_next_tx()
+
+        try:
+            while running_tasks:
+                done, _ = await asyncio.wait(
+                    running_tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                finished = [(task, *running_tasks.pop(task)) for task in done]
+                # Keep fetching while the caller handles the finished txs
+                for _ in finished:
+                    _start_next_tx()
+
+                file_pin_errors = self._flush_tx_file_pins(
+                    {
+                        tx.hash: file_pins
+                        for task, tx, file_pins in finished
+                        if file_pins and task.exception() is None
+                    }
+                )
+
+                for task, tx, _ in finished:
+                    yield tx, (
+                        task.exception()
+                        or file_pin_errors.get(tx.hash)
+                        or task.result()
+                    )
+
+        finally:
+            for task in running_tasks:
+                task.cancel()
+
 
 async def make_pending_tx_exchange(config: Config) -> aio_pika.abc.AbstractExchange:
     mq_conn = await aio_pika.connect_robust(
@@ -16,7 +16,7 @@ from web3.middleware.filter import local_filter_middleware
 from web3.middleware.geth_poa import geth_poa_middleware
 
 from aleph.db.accessors.chains import get_last_height, upsert_chain_sync_status
-from aleph.db.accessors.messages import get_unconfirmed_messages
+from aleph.db.accessors.messages import get_unconfirmed_message_rows
 from aleph.db.accessors.pending_messages import count_pending_messages
 from aleph.db.accessors.pending_txs import count_pending_txs
 from aleph.db.models.chains import ChainTxDb
@@ -317,7 +317,7 @@ class EthereumConnector(ChainWriter):
                 nonce = web3.eth.get_transaction_count(account.address)
 
                 messages = list(
-                    get_unconfirmed_messages(
+                    get_unconfirmed_message_rows(
                         session=session, limit=10000, chain=Chain.ETH
                     )
                 )
@@ -23,7 +23,7 @@ from nuls2.model.transaction import Transaction
 
 from aleph.chains.common import get_verification_buffer
 from aleph.db.accessors.chains import get_last_height, upsert_chain_sync_status
-from aleph.db.accessors.messages import get_unconfirmed_messages
+from aleph.db.accessors.messages import get_unconfirmed_message_rows
 from aleph.db.accessors.pending_messages import count_pending_messages
 from aleph.db.accessors.pending_txs import count_pending_txs
 from aleph.schemas.chains.tx_context import TxContext
@@ -195,7 +195,7 @@ class Nuls2Connector(ChainWriter):
                     i = 0
 
                 messages = list(
-                    get_unconfirmed_messages(
+                    get_unconfirmed_message_rows(
                         session=session, limit=10000, chain=Chain.ETH
                     )
                 )
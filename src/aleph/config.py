@@ -169,6 +169,10 @@ def get_defaults():
             "alive_topic": "ALEPH_ALIVE",
             # Delay between connection attempts to other nodes on the network.
             "reconnect_delay": 60,
+            # Number of workers adding the messages received on IPFS pubsub.
+            "pubsub_workers": 8,
+            # Maximum number of received pubsub messages waiting for a worker.
+            "pubsub_queue_size": 1024,
             # Bootstrap peers for IPFS.
             "peers": [
                 "/dnsaddr/api1.aleph.im/ipfs/12D3KooWNgogVS6o8fVsPdzh2FJpCdJJLVSgJT38XGE1BJoCerHx",
@@ -1,5 +1,5 @@
 import datetime as dt
-from typing import Collection, Iterable, Optional, Tuple
+from typing import Collection, Dict, Iterable, Optional, Tuple
 
 from sqlalchemy import delete, func, select
 from sqlalchemy.dialects.postgresql import insert
@@ -47,6 +47,35 @@ def upsert_tx_file_pin(
     session.execute(upsert_stmt)
 
 
+def upsert_tx_file_pins(
+    session: DbSession, tx_file_pins: Collection[Tuple[str, str, dt.datetime]]
+) -> None:
+    """
+    Upserts multiple tx file pins in a single statement.
+
+    :param tx_file_pins: (file hash, tx hash, creation datetime) tuples.
+    """
+    if not tx_file_pins:
+        return
+
+    upsert_stmt = (
+        insert(TxFilePinDb)
+        .values(
+            [
+                {
+                    "file_hash": file_hash,
+                    "tx_hash": tx_hash,
+                    "type": FilePinType.TX,
+                    "created": created,
+                }
+                for file_hash, tx_hash, created in tx_file_pins
+            ]
+        )
+        .on_conflict_do_nothing()
+    )
+    session.execute(upsert_stmt)
+
+
 def insert_content_file_pin(
     session: DbSession,
     file_hash: str,
@@ -84,8 +113,10 @@ def insert_message_file_pin(
 
 
 def count_file_pins(session: DbSession, file_hash: str) -> int:
-    select_count_stmt = select(func.count()).select_from(
-        select(FilePinDb).where(FilePinDb.file_hash == file_hash).subquery()
+    select_count_stmt = (
+        select(func.count())
+        .select_from(FilePinDb)
+        .where(FilePinDb.file_hash == file_hash)
     )
     return session.execute(select_count_stmt).scalar_one()
 
@@ -134,6 +165,44 @@ def get_message_file_pin(
     ).scalar_one_or_none()
 
 
+def get_files_by_refs(
+    session: DbSession, refs: Collection[Tuple[str, bool]]
+) -> Dict[Tuple[str, bool], StoredFileDb]:
+    """
+    Returns the files referenced by volumes or other message fields, in at most two queries.
+
+    :param refs: (ref, use_latest) tuples. If `use_latest` is True, `ref` is a file tag,
+                 otherwise it is the item hash of the message that pins the file.
+    :return: A dictionary of the files found, indexed by (ref, use_latest).
+    """
+    tags = {ref for ref, use_latest in refs if use_latest}
+    item_hashes = {ref for ref, use_latest in refs if not use_latest}
+    files: Dict[Tuple[str, bool], StoredFileDb] = {}
+
+    if tags:
+        select_tags_stmt = (
+            select(FileTagDb.tag, StoredFileDb)
+            .join(StoredFileDb, FileTagDb.file_hash == StoredFileDb.hash)
+            .where(FileTagDb.tag.in_(tags))
+        )
+        for tag, file in session.execute(select_tags_stmt):
+            files[(tag, True)] = file
+
+    if item_hashes:
+        select_pins_stmt = (
+            select(MessageFilePinDb.item_hash, StoredFileDb)
+            .join(StoredFileDb, MessageFilePinDb.file_hash == StoredFileDb.hash)
+            .where(
+                (MessageFilePinDb.type == FilePinType.MESSAGE)
+                & MessageFilePinDb.item_hash.in_(item_hashes)
+            )
+        )
+        for item_hash, file in session.execute(select_pins_stmt):
+            files[(item_hash, False)] = file
+
+    return files
+
+
 def get_address_files_stats(session: DbSession, owner: str) -> Tuple[int, int]:
     select_stmt = (
         select(
@@ -189,6 +258,30 @@ def upsert_file(session: DbSession, file_hash: str, size: int, file_type: FileTy
     session.execute(upsert_file_stmt)
 
 
+def upsert_files(
+    session: DbSession, files: Collection[Tuple[str, int, FileType]]
+) -> None:
+    """
+    Upserts multiple files in a single statement.
+
+    :param files: (file hash, size, file type) tuples.
+    """
+    if not files:
+        return
+
+    upsert_files_stmt = (
+        insert(StoredFileDb)
+        .values(
+            [
+                {"hash": file_hash, "size": size, "type": file_type}
+                for file_hash, size, file_type in files
+            ]
+        )
+        .on_conflict_do_nothing(constraint="files_pkey")
+    )
+    session.execute(upsert_files_stmt)
+
+
 def get_file(session: DbSession, file_hash: str) -> Optional[StoredFileDb]:
     select_stmt = select(StoredFileDb).where(StoredFileDb.hash == file_hash)
     return session.execute(select_stmt).scalar_one_or_none()
@@ -5,6 +5,7 @@ from typing import Any, Iterable, Mapping, Optional, Sequence, Tuple, Union, ove
 from aleph_message.models import Chain, ItemHash, MessageType
 from sqlalchemy import delete, func, nullsfirst, nullslast, select, text, update
 from sqlalchemy.dialects.postgresql import array, insert
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import load_only, selectinload
 from sqlalchemy.sql import Insert, Select
 from sqlalchemy.sql.elements import literal
@@ -254,10 +255,7 @@ def refresh_address_stats_mat_view(session: DbSession) -> None:
 
 # TODO: declare a type that will match the result (something like UnconfirmedMessageDb)
 #       and translate the time field to epoch.
-def get_unconfirmed_messages(
-    session: DbSession, limit: int = 100, chain: Optional[Chain] = None
-) -> Iterable[MessageDb]:
-
+def _make_unconfirmed_messages_filter(chain: Optional[Chain]):
     if chain is None:
         select_message_confirmations = select(message_confirmations.c.item_hash).where(
             message_confirmations.c.item_hash == MessageDb.item_hash
@@ -272,13 +270,39 @@ def get_unconfirmed_messages(
             )
         )
 
-    select_stmt = select(MessageDb).where(
-        MessageDb.signature.isnot(None) & (~select_message_confirmations.exists())
-    )
+    return MessageDb.signature.isnot(None) & (~select_message_confirmations.exists())
+
+
+def get_unconfirmed_messages(
+    session: DbSession, limit: int = 100, chain: Optional[Chain] = None
+) -> Iterable[MessageDb]:
 
+    select_stmt = select(MessageDb).where(_make_unconfirmed_messages_filter(chain))
     return (session.execute(select_stmt.limit(limit))).scalars()
 
 
+def get_unconfirmed_message_rows(
+    session: DbSession, limit: int = 100, chain: Optional[Chain] = None
+) -> Iterable[Row]:
+    """
+    Same as `get_unconfirmed_messages`, but only returns the columns required to build
+    sync archives, as rows. This avoids the cost of loading full ORM objects.
+    """
+
+    select_stmt = select(
+        MessageDb.sender,
+        MessageDb.chain,
+        MessageDb.signature,
+        MessageDb.type,
+        MessageDb.item_content,
+        MessageDb.item_type,
+        MessageDb.item_hash,
+        MessageDb.time,
+        MessageDb.channel,
+    ).where(_make_unconfirmed_messages_filter(chain))
+    return session.execute(select_stmt.limit(limit))
+
+
 def make_message_upsert_query(message: MessageDb) -> Insert:
     return (
         insert(MessageDb)
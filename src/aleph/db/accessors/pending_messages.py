@@ -102,6 +102,16 @@ def count_pending_messages(session: DbSession, chain: Optional[Chain] = None) ->
     return (session.execute(select_stmt)).scalar_one()
 
 
+def has_pending_messages(session: DbSession) -> bool:
+    """
+    Returns whether there is at least one pending message.
+
+    Cheaper than counting pending messages as Postgres can stop at the first row.
+    """
+    select_stmt = select(PendingMessageDb.id).limit(1)
+    return session.execute(select_stmt).first() is not None
+
+
 def make_pending_message_fetched_statement(
     pending_message: PendingMessageDb, content: Dict[str, Any]
 ) -> Update:
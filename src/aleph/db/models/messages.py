@@ -1,5 +1,5 @@
 import datetime as dt
-from typing import Any, Dict, List, Mapping, Optional, Type
+from typing import Any, Dict, Final, List, Mapping, Optional, Type
 
 from aleph_message.models import (
     AggregateContent,
@@ -47,6 +47,15 @@ CONTENT_TYPE_MAP: Dict[MessageType, Type[BaseContent]] = {
 }
 
 
+# Range of the timestamps that can be converted to datetime objects (years 1 to 9999).
+_MIN_CONTENT_TIMESTAMP: Final = dt.datetime.min.replace(
+    tzinfo=dt.timezone.utc
+).timestamp()
+_MAX_CONTENT_TIMESTAMP: Final = dt.datetime.max.replace(
+    tzinfo=dt.timezone.utc
+).timestamp()
+
+
 message_confirmations = Table(
     "message_confirmations",
     Base.metadata,
@@ -63,13 +72,12 @@ def validate_message_content(
 ) -> BaseContent:
     content_type = CONTENT_TYPE_MAP[message_type]
     content = content_type.parse_obj(content_dict)
-    # Validate that the content time can be converted to datetime. This will
-    # raise a ValueError and be caught
+    # Validate that the content time can be converted to datetime. A simple range
+    # check is enough and avoids converting the timestamp for every message.
     # TODO: move this validation in aleph-message
-    try:
-        _ = dt.datetime.fromtimestamp(content_dict["time"])
-    except ValueError as e:
-        raise ValidationError([ErrorWrapper(e, loc="time")], model=content_type) from e
+    if not _MIN_CONTENT_TIMESTAMP <= content.time < _MAX_CONTENT_TIMESTAMP:
+        error = ValueError(f"timestamp {content.time} is out of range")
+        raise ValidationError([ErrorWrapper(error, loc="time")], model=content_type)
 
     return content
 
@@ -1,6 +1,6 @@
 import logging
 from decimal import Decimal
-from typing import List, Protocol, Set, Union, overload
+from typing import Dict, List, Protocol, Set, Tuple, Union, overload
 
 from aleph_message.models import (
     ExecutableContent,
@@ -20,12 +20,7 @@ from aleph_message.models.execution.volume import (
 
 from aleph.db.accessors.balances import get_total_balance
 from aleph.db.accessors.cost import get_total_cost_for_address
-from aleph.db.accessors.files import (
-    find_file_pins,
-    find_file_tags,
-    get_file_tag,
-    get_message_file_pin,
-)
+from aleph.db.accessors.files import find_file_pins, find_file_tags, get_files_by_refs
 from aleph.db.accessors.vms import (
     delete_vm,
     delete_vm_updates,
@@ -281,23 +276,17 @@ def find_missing_volumes(
 def check_parent_volumes_size_requirements(
     session: DbSession, content: ExecutableContent
 ) -> None:
-    def _get_parent_volume_file(_parent: ParentVolume) -> StoredFileDb:
-        if _parent.use_latest:
-            file_tag = get_file_tag(session=session, tag=FileTag(_parent.ref))
-            if file_tag is None:
-                raise InternalError(
-                    f"Could not find latest version of parent volume {_parent.ref}"
-                )
-
-            return file_tag.file
-
-        file_pin = get_message_file_pin(session=session, item_hash=_parent.ref)
-        if file_pin is None:
+    def _get_parent_volume_file(
+        _files: Dict[Tuple[str, bool], StoredFileDb], _parent: ParentVolume
+    ) -> StoredFileDb:
+        file = _files.get((_parent.ref, _parent.use_latest))
+        if file is None:
+            version = "latest" if _parent.use_latest else "original"
             raise InternalError(
-                f"Could not find original version of parent volume {_parent.ref}"
+                f"Could not find {version} version of parent volume {_parent.ref}"
             )
 
-        return file_pin.file
+        return file
 
     class HasParent(Protocol):
         parent: ParentVolume
@@ -312,9 +301,19 @@ def check_parent_volumes_size_requirements(
     if isinstance(content, InstanceContent):
         volumes_with_parent.append(content.rootfs)
 
+    # Fetch the files of all the parent volumes at once
+    parent_files = get_files_by_refs(
+        session=session,
+        refs=[
+            (volume.parent.ref, volume.parent.use_latest)
+            for volume in volumes_with_parent
+            if volume.parent
+        ],
+    )
+
     for volume in volumes_with_parent:
         if volume.parent:
-            volume_metadata = _get_parent_volume_file(volume.parent)
+            volume_metadata = _get_parent_volume_file(parent_files, volume.parent)
             volume_size = volume.size_mib * 1024 * 1024
             if volume_size < volume_metadata.size:
                 raise VmVolumeTooSmall(
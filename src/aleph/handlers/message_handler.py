@@ -1,6 +1,6 @@
 import datetime as dt
 import logging
-from typing import Any, Dict, Mapping, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
 
 import aio_pika.abc
 import psycopg2
@@ -8,7 +8,9 @@ import sqlalchemy.exc
 from aleph_message.models import ItemHash, ItemType, MessageType
 from configmanager import Config
 from pydantic import ValidationError
+from sqlalchemy import select
 from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import Insert
 
 from aleph.chains.signature_verifier import SignatureVerifier
 from aleph.db.accessors.files import insert_content_file_pin, upsert_file
@@ -53,6 +55,19 @@ from aleph.types.message_status import (
 LOGGER = logging.getLogger(__name__)
 
 
+def _get_pending_message_key(
+    pending_message: PendingMessageDb,
+) -> Tuple[str, str, Optional[str]]:
+    """
+    Returns the fields of the unique constraint of pending messages.
+    """
+    return (
+        pending_message.sender,
+        pending_message.item_hash,
+        pending_message.signature,
+    )
+
+
 class BaseMessageHandler:
     content_handlers: Dict[MessageType, ContentHandler]
 
@@ -180,6 +195,57 @@ class MessagePublisher(BaseMessageHandler):
                 routing_key=f"{process_or_fetch}.{pending_message.item_hash}",
             )
 
+    async def _make_pending_message(
+        self,
+        session: DbSession,
+        message_dict: Mapping[str, Any],
+        reception_time: dt.datetime,
+        tx_hash: Optional[str],
+        check_message: bool,
+        origin: Optional[MessageOrigin],
+    ) -> PendingMessageDb:
+        """
+        Validates a new message and builds the corresponding pending message.
+
+        :raises InvalidMessageException: If the message is invalid.
+        """
+        # we don't check signatures yet.
+        message = parse_message(message_dict)
+        pending_message = PendingMessageDb.from_obj(
+            message,
+            reception_time=reception_time,
+            tx_hash=tx_hash,
+            check_message=check_message,
+            origin=origin,
+        )
+        return await self.load_fetched_content(session, pending_message)
+
+    @staticmethod
+    def _make_pending_status_upsert_query(
+        pending_message: PendingMessageDb, reception_time: dt.datetime
+    ) -> Insert:
+        return make_message_status_upsert_query(
+            item_hash=pending_message.item_hash,
+            new_status=MessageStatus.PENDING,
+            reception_time=reception_time,
+            where=MessageStatusDb.status == MessageStatus.REJECTED,
+        )
+
+    @staticmethod
+    def _make_pending_messages_insert_query(
+        pending_messages: Sequence[PendingMessageDb],
+    ) -> Insert:
+        return (
+            insert(PendingMessageDb)
+            .values(
+                [
+                    pending_message.to_dict(exclude={"id"})
+                    for pending_message in pending_messages
+                ]
+            )
+            .on_conflict_do_nothing("uq_pending_message")
+        )
+
     async def add_pending_message(
         self,
         message_dict: Mapping[str, Any],
@@ -188,36 +254,18 @@ class MessagePublisher(BaseMessageHandler):
         check_message: bool = True,
         origin: Optional[MessageOrigin] = MessageOrigin.P2P,
     ) -> Optional[PendingMessageDb]:
-        # TODO: this implementation is just messy, improve it.
         with self.session_factory() as session:
             try:
-                # we don't check signatures yet.
-                message = parse_message(message_dict)
-            except InvalidMessageException as e:
-                LOGGER.warning(e)
-                reject_new_pending_message(
+                pending_message = await self._make_pending_message(
                     session=session,
-                    pending_message=message_dict,
-                    exception=e,
+                    message_dict=message_dict,
+                    reception_time=reception_time,
                     tx_hash=tx_hash,
-                )
-                session.commit()
-                return None
-
-            pending_message = PendingMessageDb.from_obj(
-                message,
-                reception_time=reception_time,
-                tx_hash=tx_hash,
-                check_message=check_message,
-                origin=origin,
-            )
-
-            try:
-                pending_message = await self.load_fetched_content(
-                    session, pending_message
+                    check_message=check_message,
+                    origin=origin,
                 )
             except InvalidMessageException as e:
-                LOGGER.warning("Invalid message: %s - %s", message.item_hash, str(e))
+                LOGGER.warning("Invalid message: %s", str(e))
                 reject_new_pending_message(
                     session=session,
                     pending_message=message_dict,
@@ -240,21 +288,15 @@ class MessagePublisher(BaseMessageHandler):
             if existing_message:
                 return existing_message
 
-            upsert_message_status_stmt = make_message_status_upsert_query(
-                item_hash=pending_message.item_hash,
-                new_status=MessageStatus.PENDING,
-                reception_time=reception_time,
-                where=MessageStatusDb.status == MessageStatus.REJECTED,
-            )
-            insert_pending_message_stmt = (
-                insert(PendingMessageDb)
-                .values(pending_message.to_dict(exclude={"id"}))
-                .on_conflict_do_nothing("uq_pending_message")
-            )
-
             try:
-                session.execute(upsert_message_status_stmt)
-                session.execute(insert_pending_message_stmt)
+                session.execute(
+                    self._make_pending_status_upsert_query(
+                        pending_message, reception_time
+                    )
+                )
+                session.execute(
+                    self._make_pending_messages_insert_query([pending_message])
+                )
                 session.commit()
             except sqlalchemy.exc.IntegrityError:
                 # Handle the unique constraint violation.
@@ -280,6 +322,139 @@ class MessagePublisher(BaseMessageHandler):
             await self._publish_pending_message(pending_message)
             return pending_message
 
+    async def add_pending_messages(
+        self,
+        message_dicts: Sequence[Mapping[str, Any]],
+        reception_time: dt.datetime,
+        tx_hash: Optional[str] = None,
+        check_message: bool = True,
+        origin: Optional[MessageOrigin] = MessageOrigin.P2P,
+    ) -> List[PendingMessageDb]:
+        """
+        Adds multiple pending messages, ex: the messages of a chain tx, in a single
+        DB transaction.
+
+        Behaves like calling `add_pending_message` for each message, but inserts all
+        the valid pending messages with one statement. Falls back to adding the messages
+        one by one if the transaction fails.
+
+        :return: The pending messages inserted in the DB.
+        """
+        valid_messages: List[PendingMessageDb] = []
+        rejected_messages: List[Tuple[Mapping[str, Any], BaseException]] = []
+
+        with self.session_factory() as session:
+            for message_dict in message_dicts:
+                try:
+                    pending_message = await self._make_pending_message(
+                        session=session,
+                        message_dict=message_dict,
+                        reception_time=reception_time,
+                        tx_hash=tx_hash,
+                        check_message=check_message,
+                        origin=origin,
+                    )
+                except InvalidMessageException as e:
+                    LOGGER.warning("Invalid message: %s", str(e))
+                    rejected_messages.append((message_dict, e))
+                    continue
+
+                valid_messages.append(pending_message)
+
+            # Ignore the messages that are already pending
+            existing_keys: Set[Tuple] = set()
+            if valid_messages:
+                select_existing_stmt = select(
+                    PendingMessageDb.sender,
+                    PendingMessageDb.item_hash,
+                    PendingMessageDb.signature,
+                ).where(
+                    PendingMessageDb.item_hash.in_(
+                        {pending.item_hash for pending in valid_messages}
+                    )
+                )
+                existing_keys = {
+                    tuple(row) for row in session.execute(select_existing_stmt)
+                }
+
+            # Also drop duplicates within the batch, the first occurrence wins
+            new_pending_messages_by_key: Dict[Tuple, PendingMessageDb] = {}
+            for pending_message in valid_messages:
+                key = _get_pending_message_key(pending_message)
+                if key not in existing_keys:
+                    new_pending_messages_by_key.setdefault(key, pending_message)
+            new_pending_messages = list(new_pending_messages_by_key.values())
+
+            try:
+                for message_dict, exception in rejected_messages:
+                    reject_new_pending_message(
+                        session=session,
+                        pending_message=message_dict,
+                        exception=exception,
+                        tx_hash=tx_hash,
+                    )
+
+                inserted_ids = {}
+                if new_pending_messages:
+                    for pending_message in new_pending_messages:
+                        session.execute(
+                            self._make_pending_status_upsert_query(
+                                pending_message, reception_time
+                            )
+                        )
+
+                    insert_pending_messages_stmt = (
+                        self._make_pending_messages_insert_query(
+                            new_pending_messages
+                        ).returning(
+                            PendingMessageDb.id,
+                            PendingMessageDb.sender,
+                            PendingMessageDb.item_hash,
+                            PendingMessageDb.signature,
+                        )
+                    )
+                    inserted_ids = {
+                        (row.sender, row.item_hash, row.signature): row.id
+                        for row in session.execute(insert_pending_messages_stmt)
+                    }
+                session.commit()
+
+            except (psycopg2.Error, sqlalchemy.exc.SQLAlchemyError) as e:
+                LOGGER.warning(
+                    "Failed to add %d pending messages at once, adding them one by one"
+                    " - DB error: %s",
+                    len(message_dicts),
+                    str(e),
+                )
+                session.rollback()
+                inserted_messages = []
+                for message_dict in message_dicts:
+                    inserted_message = await self.add_pending_message(
+                        message_dict=message_dict,
+                        reception_time=reception_time,
+                        tx_hash=tx_hash,
+                        check_message=check_message,
+                        origin=origin,
+                    )
+                    if inserted_message is not None:
+                        inserted_messages.append(inserted_message)
+                return inserted_messages
+
+        inserted_messages = []
+        for pending_message in new_pending_messages:
+            pending_message_id = inserted_ids.get(
+                _get_pending_message_key(pending_message)
+            )
+            # Inserted concurrently by another task
+            if pending_message_id is None:
+                continue
+
+            pending_message.id = pending_message_id
+            await self._publish_pending_message(pending_message)
+            inserted_messages.append(pending_message)
+
+        return inserted_messages
+
 
 class MessageHandler(BaseMessageHandler):
     """
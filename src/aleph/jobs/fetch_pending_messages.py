@@ -13,6 +13,7 @@ from setproctitle import setproctitle
 from aleph.chains.signature_verifier import SignatureVerifier
 from aleph.db.accessors.pending_messages import (
     get_next_pending_messages,
+    has_pending_messages,
     make_pending_message_fetched_statement,
 )
 from aleph.db.connection import make_engine, make_session_factory
@@ -84,8 +85,14 @@ class PendingMessageFetcher(MessageJob):
         # Reset stats to avoid nonsensical values if the job restarts
         retry_messages_cache_key = "retry_messages_job_tasks"
         await node_cache.set(retry_messages_cache_key, 0)
+        # Number of tasks last written to the cache. The cache is only updated once
+        # per iteration instead of once per started/finished task.
+        nb_cached_tasks = 0
         max_concurrent_tasks = config.aleph.jobs.pending_messages.max_concurrency.value
         fetch_tasks: Set[asyncio.Task] = set()
+        # Finished tasks are pushed here by a done callback. This avoids rebuilding
+        # the set of pending tasks with asyncio.wait() on every iteration.
+        finished_task_queue: asyncio.Queue[asyncio.Task] = asyncio.Queue()
         task_message_dict: Dict[asyncio.Task, PendingMessageDb] = {}
         messages_being_fetched: Set[str] = set()
         fetched_messages: List[MessageDb] = []
@@ -93,13 +100,14 @@ class PendingMessageFetcher(MessageJob):
         while True:
             with self.session_factory() as session:
                 if fetch_tasks:
-                    finished_tasks, fetch_tasks = await asyncio.wait(
-                        fetch_tasks, return_when=asyncio.FIRST_COMPLETED
-                    )
+                    finished_tasks = [await finished_task_queue.get()]
+                    while not finished_task_queue.empty():
+                        finished_tasks.append(finished_task_queue.get_nowait())
+
                     for finished_task in finished_tasks:
+                        fetch_tasks.discard(finished_task)
                         pending_message = task_message_dict.pop(finished_task)
                         messages_being_fetched.remove(pending_message.item_hash)
-                        await node_cache.decr(retry_messages_cache_key)
 
                 if len(fetch_tasks) < max_concurrent_tasks:
                     pending_messages = get_next_pending_messages(
@@ -119,21 +127,24 @@ class PendingMessageFetcher(MessageJob):
                         # Check if the message is already processing
                         messages_being_fetched.add(pending_message.item_hash)
 
-                        await node_cache.incr(retry_messages_cache_key)
-
                         message_task = asyncio.create_task(
                             self.fetch_pending_message(
                                 pending_message=pending_message,
                             )
                         )
+                        message_task.add_done_callback(finished_task_queue.put_nowait)
                         fetch_tasks.add(message_task)
                         task_message_dict[message_task] = pending_message
 
+                if len(fetch_tasks) != nb_cached_tasks:
+                    nb_cached_tasks = len(fetch_tasks)
+                    await node_cache.set(retry_messages_cache_key, nb_cached_tasks)
+
                 if fetched_messages:
                     yield fetched_messages
                     fetched_messages = []
 
-                if not PendingMessageDb.count(session):
+                if not has_pending_messages(session):
                     # If not in loop mode, stop if there are no more pending messages
                     if not loop:
                         break
@@ -4,7 +4,7 @@ Job in charge of loading messages stored on-chain and put them in the pending me
 
 import asyncio
 import logging
-from typing import Dict, Optional, Set
+from typing import Any, Dict, List, Optional, Sequence, Set
 
 import aio_pika.abc
 from configmanager import Config
@@ -13,7 +13,7 @@ from setproctitle import setproctitle
 from aleph.chains.chain_data_service import ChainDataService
 from aleph.db.accessors.pending_txs import delete_pending_tx, get_pending_txs
 from aleph.db.connection import make_engine, make_session_factory
-from aleph.db.models import PendingTxDb
+from aleph.db.models import ChainTxDb, PendingTxDb
 from aleph.handlers.message_handler import MessagePublisher
 from aleph.services.cache.node_cache import NodeCache
 from aleph.services.ipfs.service import IpfsService
@@ -47,30 +47,17 @@ class PendingTxProcessor(MqWatcher):
         self.chain_data_service = chain_data_service
         self.pending_tx_queue = pending_tx_queue
 
-    async def handle_pending_tx(
-        self, pending_tx: PendingTxDb, seen_ids: Optional[Set[str]] = None
+    async def _publish_tx_messages(
+        self, tx: ChainTxDb, messages: List[Dict[str, Any]]
     ) -> None:
-        LOGGER.info(
-            "%s Handling TX in block %s", pending_tx.tx.chain, pending_tx.tx.height
-        )
-
-        tx = pending_tx.tx
-
-        # If the chain data file is unavailable, we leave it to the pending tx
-        # processor to log the content unavailable exception and retry later.
-        messages = await self.chain_data_service.get_tx_messages(
-            tx=pending_tx.tx, seen_ids=seen_ids
-        )
-
         if messages:
-            for i, message_dict in enumerate(messages):
-                await self.message_publisher.add_pending_message(
-                    message_dict=message_dict,
-                    reception_time=utc_now(),
-                    tx_hash=tx.hash,
-                    check_message=tx.protocol != ChainSyncProtocol.SMART_CONTRACT,
-                    origin=MessageOrigin.ONCHAIN,
-                )
+            await self.message_publisher.add_pending_messages(
+                message_dicts=messages,
+                reception_time=utc_now(),
+                tx_hash=tx.hash,
+                check_message=tx.protocol != ChainSyncProtocol.SMART_CONTRACT,
+                origin=MessageOrigin.ONCHAIN,
+            )
 
             # bogus or handled, we remove it.
             with self.session_factory() as session:
@@ -80,15 +67,53 @@ class PendingTxProcessor(MqWatcher):
         else:
             LOGGER.debug("TX contains no message")
 
+    async def handle_pending_txs(
+        self,
+        pending_txs: Sequence[PendingTxDb],
+        max_concurrent_tasks: int,
+        seen_ids: Optional[Set[str]] = None,
+    ) -> None:
+        """
+        Handles a batch of pending txs. The messages of the txs are fetched
+        concurrently, and the messages of each tx are published as soon as they
+        are available.
+
+        Txs that fail are left in the pending txs table and retried later.
+        """
+        for pending_tx in pending_txs:
+            LOGGER.info(
+                "%s Handling TX in block %s", pending_tx.tx.chain, pending_tx.tx.height
+            )
+
+        # If the chain data file is unavailable, we leave the tx in the pending txs
+        # table and retry later.
+        async for tx, result in self.chain_data_service.iter_tx_messages(
+            txs=[pending_tx.tx for pending_tx in pending_txs],
+            max_concurrency=max_concurrent_tasks,
+            seen_ids=seen_ids,
+        ):
+            if isinstance(result, BaseException):
+                LOGGER.warning(
+                    "Could not get the messages of tx %s/%s: %s",
+                    tx.chain,
+                    tx.hash,
+                    repr(result),
+                )
+                continue
+
+            try:
+                await self._publish_tx_messages(tx=tx, messages=result)
+            except Exception:
+                LOGGER.exception("Could not publish the messages of tx %s", tx.hash)
+
     async def process_pending_txs(self, max_concurrent_tasks: int):
         """
         Process chain transactions in the Pending TX queue.
         """
 
-        tasks: Set[asyncio.Task] = set()
-
         seen_offchain_hashes = set()
         seen_ids: Set[str] = set()
+        pending_txs: List[PendingTxDb] = []
         LOGGER.info("handling TXs")
         with self.session_factory() as session:
             for pending_tx in get_pending_txs(session):
@@ -96,23 +121,16 @@ class PendingTxProcessor(MqWatcher):
                 if pending_tx.tx.protocol == ChainSyncProtocol.OFF_CHAIN_SYNC:
                     if pending_tx.tx.content in seen_offchain_hashes:
                         continue
-
-                if len(tasks) == max_concurrent_tasks:
-                    done, tasks = await asyncio.wait(
-                        tasks, return_when=asyncio.FIRST_COMPLETED
-                    )
-
-                if pending_tx.tx.protocol == ChainSyncProtocol.OFF_CHAIN_SYNC:
                     seen_offchain_hashes.add(pending_tx.tx.content)
 
-                tx_task = asyncio.create_task(
-                    self.handle_pending_tx(pending_tx, seen_ids=seen_ids)
-                )
-                tasks.add(tx_task)
+                pending_txs.append(pending_tx)
 
-            # Wait for the last tasks
-            if tasks:
-                done, _ = await asyncio.wait(tasks, return_when=asyncio.ALL_COMPLETED)
+            if pending_txs:
+                await self.handle_pending_txs(
+                    pending_txs=pending_txs,
+                    max_concurrent_tasks=max_concurrent_tasks,
+                    seen_ids=seen_ids,
+                )
 
 
 async def handle_txs_task(config: Config):
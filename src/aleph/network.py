@@ -19,7 +19,7 @@ from aleph.types.message_status import InvalidMessageFormat
 LOGGER = logging.getLogger(__name__)
 
 
-async def decode_pubsub_message(message_data: bytes) -> Dict[str, Any]:
+def decode_pubsub_message(message_data: bytes) -> Dict[str, Any]:
     """
     Extracts an Aleph message out of a pubsub message.
 
@@ -79,6 +79,8 @@ async def listener_tasks(
                 ipfs_service=ipfs_service,
                 topic=config.aleph.queue_topic.value,
                 message_publisher=message_publisher,
+                nb_workers=config.ipfs.pubsub_workers.value,
+                queue_size=config.ipfs.pubsub_queue_size.value,
             )
         )
     return tasks
@@ -1,6 +1,6 @@
 import math
 from decimal import Decimal
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 
 from aleph_message.models import ExecutableContent, InstanceContent, ProgramContent
 from aleph_message.models.execution.environment import InstanceEnvironment
@@ -12,8 +12,7 @@ from aleph_message.models.execution.volume import (
 )
 
 from aleph.db.accessors.aggregates import get_aggregate_by_key
-from aleph.db.accessors.files import get_file_tag, get_message_file_pin
-from aleph.db.models import FileTagDb, MessageFilePinDb, StoredFileDb
+from aleph.db.accessors.files import get_files_by_refs
 from aleph.db.models.aggregates import AggregateDb
 from aleph.toolkit.constants import (
     HOUR,
@@ -23,7 +22,6 @@ from aleph.toolkit.constants import (
 )
 from aleph.types.cost import ProductPriceType, ProductPricing
 from aleph.types.db_session import DbSession
-from aleph.types.files import FileTag
 
 
 def _is_on_demand(content: ExecutableContent) -> bool:
@@ -78,22 +76,6 @@ def _get_product_price(
     return ProductPricing.from_aggregate(type, aggregate)
 
 
-def _get_file_from_ref(
-    session: DbSession, ref: str, use_latest: bool
-) -> Optional[StoredFileDb]:
-    tag_or_pin: Optional[Union[MessageFilePinDb, FileTagDb]]
-
-    if use_latest:
-        tag_or_pin = get_file_tag(session=session, tag=FileTag(ref))
-    else:
-        tag_or_pin = get_message_file_pin(session=session, item_hash=ref)
-
-    if tag_or_pin:
-        return tag_or_pin.file
-
-    return None
-
-
 def _get_nb_compute_units(content: ExecutableContent) -> int:
     cpu = content.resources.vcpus
     memory = math.ceil(content.resources.memory / 2048)
@@ -132,19 +114,22 @@ def get_volume_size(session: DbSession, content: ExecutableContent) -> int:
 
     total_volume_size: int = 0
 
+    refs: List[Tuple[str, bool]] = []
     for volume in ref_volumes:
         if hasattr(volume, "ref") and hasattr(volume, "use_latest"):
-            file = _get_file_from_ref(
-                session=session, ref=volume.ref, use_latest=volume.use_latest
-            )
-            if file is None:
-                raise RuntimeError(
-                    f"Could not find entry in file tags for {volume.ref}."
-                )
-            total_volume_size += file.size
+            refs.append((volume.ref, volume.use_latest))
         else:
             raise RuntimeError(f"Could not find reference hash for {volume}.")
 
+    # Fetch all the referenced files at once
+    files = get_files_by_refs(session=session, refs=refs)
+
+    for ref, use_latest in refs:
+        file = files.get((ref, use_latest))
+        if file is None:
+            raise RuntimeError(f"Could not find entry in file tags for {ref}.")
+        total_volume_size += file.size
+
     for volume in sized_volumes:
         total_volume_size += volume.size_mib * MiB
 
@@ -206,7 +191,7 @@ def compute_cost(session: DbSession, content: ExecutableContent) -> Decimal:
     )
 
     additional_storage_price = get_additional_storage_price(content, pricing, session)
-    return Decimal(compute_unit_price + additional_storage_price)
+    return compute_unit_price + additional_storage_price
 
 
 def compute_flow_cost(session: DbSession, content: ExecutableContent) -> Decimal:
@@ -225,4 +210,4 @@ def compute_flow_cost(session: DbSession, content: ExecutableContent) -> Decimal
     additional_storage_flow_price = _get_additional_storage_flow_price(
         content, pricing, session
     )
-    return Decimal(compute_unit_price + additional_storage_flow_price)
+    return compute_unit_price + additional_storage_flow_price
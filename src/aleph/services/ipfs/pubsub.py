@@ -1,5 +1,6 @@
 import asyncio
 import logging
+from typing import Any, Dict
 
 from aleph.toolkit.timestamp import utc_now
 from aleph.types.message_status import InvalidMessageException
@@ -9,22 +10,54 @@ from .service import IpfsService
 LOGGER = logging.getLogger(__name__)
 
 
-# TODO: add type hint for message_processor, it currently causes a cyclical import
-async def incoming_channel(
-    ipfs_service: IpfsService, topic: str, message_publisher
+async def _handle_incoming_messages(
+    queue: asyncio.Queue[Dict[str, Any]], message_publisher
 ) -> None:
     from aleph.network import decode_pubsub_message
 
     while True:
+        mvalue = await queue.get()
         try:
-            async for mvalue in ipfs_service.sub(topic):
-                try:
-                    message_dict = await decode_pubsub_message(mvalue["data"])
-                    await message_publisher.add_pending_message(
-                        message_dict=message_dict, reception_time=utc_now()
-                    )
-                except InvalidMessageException:
-                    LOGGER.warning(f"Invalid message {mvalue}")
+            message_dict = decode_pubsub_message(mvalue["data"])
+            await message_publisher.add_pending_message(
+                message_dict=message_dict, reception_time=utc_now()
+            )
+        except InvalidMessageException:
+            LOGGER.warning(f"Invalid message {mvalue}")
         except Exception:
-            LOGGER.exception("Exception in IPFS pubsub, reconnecting in 100 ms...")
-            await asyncio.sleep(0.1)
+            LOGGER.exception("Can't handle message")
+
+
+# TODO: add type hint for message_processor, it currently causes a cyclical import
+async def incoming_channel(
+    ipfs_service: IpfsService,
+    topic: str,
+    message_publisher,
+    nb_workers: int,
+    queue_size: int,
+) -> None:
+    """
+    Listens to an IPFS pubsub topic and adds the messages received to the pending messages.
+
+    Messages are decoded and inserted by a pool of workers so that a slow insertion
+    does not hold up the reception of the next messages. When the queue of received
+    messages is full, the subscription waits for the workers to catch up.
+    """
+    queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=queue_size)
+    workers = [
+        asyncio.create_task(_handle_incoming_messages(queue, message_publisher))
+        for _ in range(nb_workers)
+    ]
+
+    try:
+        while True:
+            try:
+                async for mvalue in ipfs_service.sub(topic):
+                    await queue.put(mvalue)
+            except Exception:
+                LOGGER.exception("Exception in IPFS pubsub, reconnecting in 100 ms...")
+                await asyncio.sleep(0.1)
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -1,7 +1,7 @@
 import asyncio
 import logging
-from collections import deque
-from typing import Any
+from collections import OrderedDict
+from typing import Any, Tuple
 
 from aleph_p2p_client import AlephP2PServiceClient
 
@@ -12,6 +12,9 @@ from aleph.types.message_status import InvalidMessageException
 
 LOGGER = logging.getLogger(__name__)
 
+# Number of recently received messages remembered to ignore duplicates.
+SEEN_MESSAGES_MAX_SIZE = 200000
+
 
 async def incoming_channel(
     p2p_client: AlephP2PServiceClient, topic: str, message_publisher: MessagePublisher
@@ -19,7 +22,9 @@ async def incoming_channel(
     LOGGER.debug("incoming channel started...")
 
     await p2p_client.subscribe(topic)
-    seen_hashes: deque[tuple[Any, Any, Any]] = deque([], maxlen=200000)
+    # Bounded set, the oldest entries are evicted first. Unlike a deque, membership
+    # checks do not scan the whole collection.
+    seen_hashes: OrderedDict[Tuple[Any, Any, Any], None] = OrderedDict()
 
     while True:
         try:
@@ -36,24 +41,21 @@ async def incoming_channel(
                     # We should check the sender here to avoid spam
                     # and such things...
                     try:
-                        message_dict = await decode_pubsub_message(message.body)
+                        message_dict = decode_pubsub_message(message.body)
                         # Implemented an in-memory cache to avoid deal with the same messages different times.
-                        if (
+                        message_key = (
                             message_dict["sender"],
                             message_dict["item_hash"],
                             message_dict["signature"],
-                        ) in seen_hashes:
+                        )
+                        if message_key in seen_hashes:
                             # Messages are already ACKed on underlying implementation in p2p_client.receive_messages()
                             # if the process don't have issues
                             continue
 
-                        seen_hashes.append(
-                            (
-                                message_dict["sender"],
-                                message_dict["item_hash"],
-                                message_dict["signature"],
-                            )
-                        )
+                        seen_hashes[message_key] = None
+                        if len(seen_hashes) > SEEN_MESSAGES_MAX_SIZE:
+                            seen_hashes.popitem(last=False)
                     except InvalidMessageException:
                         LOGGER.warning(
                             "Received invalid message on P2P topic %s from %s",
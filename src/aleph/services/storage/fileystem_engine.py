@@ -1,9 +1,20 @@
 from pathlib import Path
 from typing import Optional, Union
 
+from aleph.utils import run_in_executor
+
 from .engine import StorageEngine
 
 
+def _read_file(file_path: Path) -> Optional[bytes]:
+    # Open the file directly instead of checking that it exists first,
+    # this saves a stat() call per read.
+    try:
+        return file_path.read_bytes()
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+
+
 class FileSystemStorageEngine(StorageEngine):
     def __init__(self, folder: Union[Path, str]):
         self.folder = folder if isinstance(folder, Path) else Path(folder)
@@ -15,15 +26,11 @@ class FileSystemStorageEngine(StorageEngine):
 
     async def read(self, filename: str) -> Optional[bytes]:
         file_path = self.folder / filename
-
-        if not file_path.is_file():
-            return None
-
-        return file_path.read_bytes()
+        return await run_in_executor(None, _read_file, file_path)
 
     async def write(self, filename: str, content: bytes):
         file_path = self.folder / filename
-        file_path.write_bytes(content)
+        await run_in_executor(None, file_path.write_bytes, content)
 
     async def delete(self, filename: str):
         file_path = self.folder / filename
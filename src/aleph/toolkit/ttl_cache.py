@@ -0,0 +1,45 @@
+import time
+from typing import Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    A small in-process cache whose entries expire after a fixed time.
+
+    When the cache is full, the oldest entry is evicted to make room for the new one.
+    Not thread-safe, meant to be used from the event loop.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        # key -> (expiration time, value). Dicts keep the insertion order.
+        self._entries: Dict[K, Tuple[float, V]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expiration_time, value = entry
+        if expiration_time <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        # Re-inserting the key moves it to the end of the eviction order
+        if self._entries.pop(key, None) is None and len(self._entries) >= self.max_size:
+            self._entries.pop(next(iter(self._entries)))
+
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self) -> None:
+        self._entries.clear()
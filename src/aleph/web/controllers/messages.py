@@ -1,4 +1,3 @@
-import json
 import logging
 from typing import Any, Dict, Iterable, List, Optional
 
@@ -618,7 +617,7 @@ async def view_message_content(request: web.Request):
         )
 
     content = message_with_status.message.content.content
-    return web.json_response(text=json.dumps(content))
+    return web.json_response(text=aleph_json.dumps(content).decode("utf-8"))
 
 
 async def view_message_status(request: web.Request):
@@ -10,10 +10,12 @@ from aleph_message.models import ExecutableContent, ItemHash, MessageType
 from dataclasses_json import DataClassJsonMixin
 from pydantic import BaseModel, Field
 
+import aleph.toolkit.json as aleph_json
 from aleph.db.accessors.messages import get_message_by_item_hash, get_message_status
 from aleph.db.models import MessageDb
 from aleph.db.models.pending_messages import PendingMessageDb
 from aleph.services.cost import compute_cost, compute_flow_cost
+from aleph.toolkit.ttl_cache import TTLCache
 from aleph.types.db_session import DbSession
 from aleph.types.message_status import MessageStatus
 from aleph.web.controllers.app_state_getters import (
@@ -40,6 +42,18 @@ MESSAGE_STATUS_EXCEPTIONS = {
 }
 
 
+# Prices of processed messages, by item hash. The content of a message never changes,
+# but the price aggregate can. The aggregate is updated by the message processing,
+# which runs in another process than the API workers, so this cache cannot be cleared
+# when it changes. Prices may be stale for up to MESSAGE_PRICE_CACHE_TTL seconds after
+# a pricing update, which is acceptable for an informative endpoint.
+MESSAGE_PRICE_CACHE_TTL = 60
+MESSAGE_PRICE_CACHE_SIZE = 10_000
+_message_price_cache: TTLCache[str, Dict[str, Any]] = TTLCache(
+    ttl=MESSAGE_PRICE_CACHE_TTL, max_size=MESSAGE_PRICE_CACHE_SIZE
+)
+
+
 @dataclass
 class MessagePrice(DataClassJsonMixin):
     """Dataclass used to expose message required tokens."""
@@ -83,9 +97,13 @@ async def get_executable_message(session: DbSession, item_hash_str: str) -> Mess
 async def message_price(request: web.Request):
     """Returns the price of an executable message."""
 
+    item_hash = request.match_info["item_hash"]
+    if (cached_price := _message_price_cache.get(item_hash)) is not None:
+        return web.json_response(text=aleph_json.dumps(cached_price).decode("utf-8"))
+
     session_factory = get_session_factory_from_request(request)
     with session_factory() as session:
-        message = await get_executable_message(session, request.match_info["item_hash"])
+        message = await get_executable_message(session, item_hash)
 
         content: ExecutableContent = message.parsed_content
         try:
@@ -96,12 +114,12 @@ async def message_price(request: web.Request):
         except RuntimeError as e:
             raise web.HTTPNotFound(reason=str(e))
 
-    return web.json_response(
-        {
-            "required_tokens": float(required_tokens),
-            "payment_type": content.payment.type if content.payment else None,
-        }
-    )
+    price = {
+        "required_tokens": float(required_tokens),
+        "payment_type": content.payment.type if content.payment else None,
+    }
+    _message_price_cache.set(item_hash, price)
+    return web.json_response(text=aleph_json.dumps(price).decode("utf-8"))
 
 
 class PubMessageRequest(BaseModel):
@@ -141,9 +159,8 @@ async def message_price_estimate(request: web.Request):
         except RuntimeError as e:
             raise web.HTTPNotFound(reason=str(e))
 
-    return web.json_response(
-        {
-            "required_tokens": float(required_tokens),
-            "payment_type": content.payment.type if content.payment else None,
-        }
-    )
+    price = {
+        "required_tokens": float(required_tokens),
+        "payment_type": content.payment.type if content.payment else None,
+    }
+    return web.json_response(text=aleph_json.dumps(price).decode("utf-8"))
@@ -1,10 +1,12 @@
 import base64
 import hashlib
+import json
 import logging
 import os
 import tempfile
+from collections import OrderedDict
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Dict, Optional
 
 import aio_pika
 import aiofiles
@@ -15,6 +17,7 @@ from aleph_message.models import ItemType, StoreContent
 from mypy.dmypy_server import MiB
 from pydantic import ValidationError
 
+import aleph.toolkit.json as aleph_json
 from aleph.chains.signature_verifier import SignatureVerifier
 from aleph.db.accessors.balances import get_total_balance
 from aleph.db.accessors.cost import get_total_cost_for_address
@@ -26,6 +29,7 @@ from aleph.schemas.pending_messages import (
     PendingStoreMessage,
 )
 from aleph.storage import StorageService
+from aleph.toolkit.ttl_cache import TTLCache
 from aleph.types.db_session import DbSession
 from aleph.types.message_status import InvalidSignature
 from aleph.utils import item_type_from_hash, run_in_executor
@@ -48,6 +52,51 @@ logger = logging.getLogger(__name__)
 MAX_FILE_SIZE = 100 * MiB
 MAX_UNAUTHENTICATED_UPLOAD_FILE_SIZE = 25 * MiB
 MAX_UPLOAD_FILE_SIZE = 1000 * MiB
+# Uploads are written to a temporary file, each write being a thread hop with aiofiles
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Size of the base64 content above which get_hash serializes its response in an executor
+JSON_RESPONSE_EXECUTOR_THRESHOLD = 64 * 1024
+# Size of the response body above which aiohttp compresses it in an executor
+COMPRESSION_EXECUTOR_THRESHOLD = 64 * 1024
+# Raw files larger than this are streamed, so that their compressed form is never
+# held in memory in full
+STREAM_RESPONSE_THRESHOLD = 1 * MiB
+STREAM_RESPONSE_CHUNK_SIZE = 64 * 1024
+
+# Files are content-addressed and never change, so hot files can be kept in memory
+# without invalidation. Only small files are cached, up to a total size budget.
+FILE_CONTENT_CACHE_SIZE = 64 * MiB
+FILE_CONTENT_CACHE_MAX_FILE_SIZE = 1 * MiB
+# file hash -> file content, in LRU order
+_file_content_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_file_content_cache_size = 0
+
+# Pin counts of files, by file hash. Pins are added and removed by the message
+# processing, in another process, so the counts are only cached for a short time.
+FILE_PINS_COUNT_CACHE_TTL = 5
+FILE_PINS_COUNT_CACHE_SIZE = 10_000
+_file_pins_count_cache: TTLCache[str, int] = TTLCache(
+    ttl=FILE_PINS_COUNT_CACHE_TTL, max_size=FILE_PINS_COUNT_CACHE_SIZE
+)
+
+
+async def _read_json_body(request: web.Request, max_size: int) -> Any:
+    # Reject oversized bodies from their headers before reading them
+    if request.content_length is not None and request.content_length > max_size:
+        raise web.HTTPRequestEntityTooLarge(
+            max_size=max_size, actual_size=request.content_length
+        )
+
+    body = await request.read()
+    if len(body) > max_size:
+        raise web.HTTPRequestEntityTooLarge(max_size=max_size, actual_size=len(body))
+
+    # Use the stdlib parser like request.json() does: orjson turns integers above
+    # 64 bits into floats, which would change the stored content and its hash.
+    try:
+        return json.loads(body)
+    except ValueError as e:
+        raise web.HTTPUnprocessableEntity(reason=f"Could not decode JSON body: {e}")
 
 
 async def add_ipfs_json_controller(request: web.Request):
@@ -57,7 +106,7 @@ async def add_ipfs_json_controller(request: web.Request):
     config = get_config_from_request(request)
     grace_period = config.storage.grace_period.value
 
-    data = await request.json()
+    data = await _read_json_body(request, max_size=MAX_UNAUTHENTICATED_UPLOAD_FILE_SIZE)
     with session_factory() as session:
         output = {
             "status": "success",
@@ -70,7 +119,7 @@ async def add_ipfs_json_controller(request: web.Request):
         )
         session.commit()
 
-    return web.json_response(output)
+    return web.json_response(text=aleph_json.dumps(output).decode("utf-8"))
 
 
 async def add_storage_json_controller(request: web.Request):
@@ -80,7 +129,7 @@ async def add_storage_json_controller(request: web.Request):
     config = get_config_from_request(request)
     grace_period = config.storage.grace_period.value
 
-    data = await request.json()
+    data = await _read_json_body(request, max_size=MAX_UNAUTHENTICATED_UPLOAD_FILE_SIZE)
     with session_factory() as session:
         output = {
             "status": "success",
@@ -93,7 +142,7 @@ async def add_storage_json_controller(request: web.Request):
         )
         session.commit()
 
-    return web.json_response(output)
+    return web.json_response(text=aleph_json.dumps(output).decode("utf-8"))
 
 
 async def _verify_message_signature(
@@ -147,7 +196,7 @@ class UploadedFile:
 
     async def read_and_validate(self):
         total_read = 0
-        chunk_size = 8192
+        chunk_size = UPLOAD_CHUNK_SIZE
 
         # From aiofiles changelog:
         # On Python 3.12, aiofiles.tempfile.NamedTemporaryFile now accepts a
@@ -192,7 +241,8 @@ class MultipartUploadedFile(UploadedFile):
         self.file_field = file_field
 
     async def _read_chunks(self, chunk_size):
-        async for chunk in self.file_field.__aiter__():
+        # Iterating over the part reads it whole, read it chunk by chunk instead
+        while chunk := await self.file_field.read_chunk(chunk_size):
             yield chunk
 
 
@@ -380,7 +430,116 @@ def assert_file_is_downloadable(session: DbSession, file_hash: str) -> None:
 
 
 def prepare_content(content):
-    return base64.encodebytes(content).decode("utf-8")
+    # b64encode is a single C call, unlike encodebytes which splits the input
+    # into 76-character lines from Python. Line folding is not needed in a JSON field.
+    return base64.b64encode(content).decode("utf-8")
+
+
+async def _get_file_content(
+    storage_service: StorageService, item_hash: str, engine: ItemType
+) -> bytes:
+    global _file_content_cache_size
+
+    content = _file_content_cache.get(item_hash)
+    if content is not None:
+        _file_content_cache.move_to_end(item_hash)
+        return content
+
+    hash_content = await storage_service.get_hash_content(
+        item_hash,
+        use_network=False,
+        use_ipfs=True,
+        engine=engine,
+        store_value=False,
+        timeout=30,
+    )
+    content = hash_content.value
+
+    # Concurrent requests for the same file may have cached it in the meantime
+    if (
+        len(content) <= FILE_CONTENT_CACHE_MAX_FILE_SIZE
+        and item_hash not in _file_content_cache
+    ):
+        _file_content_cache[item_hash] = content
+        _file_content_cache_size += len(content)
+        while _file_content_cache_size > FILE_CONTENT_CACHE_SIZE:
+            _, evicted_content = _file_content_cache.popitem(last=False)
+            _file_content_cache_size -= len(evicted_content)
+
+    return content
+
+
+def _make_compressed_response(
+    body: bytes, content_type: Optional[str] = None
+) -> web.Response:
+    # By default, aiohttp compresses the whole body on the event loop
+    response = web.Response(
+        body=body,
+        content_type=content_type,
+        zlib_executor_size=COMPRESSION_EXECUTOR_THRESHOLD,
+    )
+    response.enable_compression()
+    return response
+
+
+async def _stream_response(request: web.Request, body: bytes) -> web.StreamResponse:
+    response = web.StreamResponse()
+    response.content_type = "application/octet-stream"
+    # Chunks are compressed one by one, in an executor, as they are written
+    response.enable_compression()
+    await response.prepare(request)
+
+    view = memoryview(body)
+    for offset in range(0, len(view), STREAM_RESPONSE_CHUNK_SIZE):
+        await response.write(view[offset : offset + STREAM_RESPONSE_CHUNK_SIZE])
+    await response.write_eof()
+    return response
+
+
+def _parse_accept_header(accept: str) -> Dict[str, float]:
+    """
+    Parses an Accept header into a mapping of media ranges to their quality (q-value).
+    Media ranges with an invalid quality are ignored.
+    """
+    media_ranges = {}
+    for media_range in accept.split(","):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        if not media_type:
+            continue
+
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = -1.0
+
+        if 0 <= quality <= 1:
+            media_ranges[media_type.lower()] = quality
+
+    return media_ranges
+
+
+def _get_media_type_quality(media_ranges: Dict[str, float], media_type: str) -> float:
+    # The most specific media range applies, ex: "application/json" over "*/*"
+    main_type, _, _ = media_type.partition("/")
+    for media_range in (media_type, f"{main_type}/*", "*/*"):
+        if media_range in media_ranges:
+            return media_ranges[media_range]
+    return 0.0
+
+
+def _accepts_raw_content(request: web.Request) -> bool:
+    """
+    Returns whether the client prefers raw bytes over JSON. JSON remains the default
+    when the client has no preference.
+    """
+    media_ranges = _parse_accept_header(request.headers.get("Accept", ""))
+    raw_quality = _get_media_type_quality(media_ranges, "application/octet-stream")
+    json_quality = _get_media_type_quality(media_ranges, "application/json")
+    return raw_quality > 0 and raw_quality > json_quality
 
 
 async def get_hash(request):
@@ -400,18 +559,20 @@ async def get_hash(request):
     storage_service = get_storage_service_from_request(request)
 
     try:
-        hash_content = await storage_service.get_hash_content(
-            item_hash,
-            use_network=False,
-            use_ipfs=True,
-            engine=engine,
-            store_value=False,
-            timeout=30,
+        file_content = await _get_file_content(
+            storage_service=storage_service, item_hash=item_hash, engine=engine
         )
     except AlephStorageException:
         return web.HTTPNotFound(text=f"No file found for hash {item_hash}")
 
-    content = await run_in_executor(None, prepare_content, hash_content.value)
+    # Clients that only want the bytes can skip the base64 encoding and JSON wrapping.
+    # Both responses share the URL, so caches must key them on the Accept header.
+    if _accepts_raw_content(request):
+        response = _make_compressed_response(file_content)
+        response.headers["Vary"] = "Accept"
+        return response
+
+    content = await run_in_executor(None, prepare_content, file_content)
     result = {
         "status": "success",
         "hash": item_hash,
@@ -419,8 +580,14 @@ async def get_hash(request):
         "content": content,
     }
 
-    response = await run_in_executor(None, web.json_response, result)
-    response.enable_compression()
+    # Serializing the response is only worth a thread hop for large files
+    if len(content) < JSON_RESPONSE_EXECUTOR_THRESHOLD:
+        body = aleph_json.dumps(result)
+    else:
+        body = await run_in_executor(None, aleph_json.dumps, result)
+
+    response = _make_compressed_response(body, content_type="application/json")
+    response.headers["Vary"] = "Accept"
     return response
 
 
@@ -442,20 +609,15 @@ async def get_raw_hash(request):
     storage_service = get_storage_service_from_request(request)
 
     try:
-        content = await storage_service.get_hash_content(
-            item_hash,
-            use_network=False,
-            use_ipfs=True,
-            engine=engine,
-            store_value=False,
-            timeout=30,
+        file_content = await _get_file_content(
+            storage_service=storage_service, item_hash=item_hash, engine=engine
         )
     except AlephStorageException as e:
         raise web.HTTPNotFound(text="Not found") from e
 
-    response = web.Response(body=content.value)
-    response.enable_compression()
-    return response
+    if len(file_content) > STREAM_RESPONSE_THRESHOLD:
+        return await _stream_response(request, file_content)
+    return _make_compressed_response(file_content)
 
 
 async def get_file_pins_count(request: web.Request) -> web.Response:
@@ -464,7 +626,12 @@ async def get_file_pins_count(request: web.Request) -> web.Response:
     if item_hash is None:
         raise web.HTTPBadRequest(text="No hash provided")
 
+    if (count := _file_pins_count_cache.get(item_hash)) is not None:
+        return web.json_response(data=count)
+
     session_factory = get_session_factory_from_request(request)
     with session_factory() as session:
         count = count_file_pins(session=session, file_hash=item_hash)
+
+    _file_pins_count_cache.set(item_hash, count)
     return web.json_response(data=count)
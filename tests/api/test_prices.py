@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+import aleph.web.controllers.prices as prices_controllers
+from aleph.db.models import AlephBalanceDb, PendingMessageDb
+from aleph.jobs.process_pending_messages import PendingMessageProcessor
+
+PRICE_URI = "/api/v0/price/{item_hash}"
+
+
+@pytest.mark.asyncio
+async def test_message_price_cache(
+    mocker,
+    ccn_api_client,
+    message_processor: PendingMessageProcessor,
+    fixture_product_prices_aggregate_in_db,
+    instance_message_with_volumes_in_db,
+    fixture_instance_message: PendingMessageDb,
+    user_balance: AlephBalanceDb,
+):
+    pipeline = message_processor.make_pipeline()
+    # Exhaust the iterator
+    _ = [message async for message in pipeline]
+
+    prices_controllers._message_price_cache.clear()
+    compute_cost_spy = mocker.spy(prices_controllers, "compute_cost")
+    uri = PRICE_URI.format(item_hash=fixture_instance_message.item_hash)
+
+    response = await ccn_api_client.get(uri)
+    assert response.status == 200, await response.text()
+    price = await response.json()
+    assert price["required_tokens"] > 0
+    assert compute_cost_spy.call_count == 1
+
+    # The second request is served from the cache
+    response = await ccn_api_client.get(uri)
+    assert response.status == 200, await response.text()
+    assert await response.json() == price
+    assert compute_cost_spy.call_count == 1
+
+    # Once the entry expires, the price is computed again
+    mock_time = mocker.patch("aleph.toolkit.ttl_cache.time")
+    mock_time.monotonic.return_value = (
+        time.monotonic() + prices_controllers.MESSAGE_PRICE_CACHE_TTL
+    )
+    response = await ccn_api_client.get(uri)
+    assert response.status == 200, await response.text()
+    assert await response.json() == price
+    assert compute_cost_spy.call_count == 2
+
+    prices_controllers._message_price_cache.clear()
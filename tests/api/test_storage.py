@@ -1,5 +1,7 @@
 import base64
+import hashlib
 import json
+from collections import OrderedDict
 from decimal import Decimal
 from typing import Any, Optional
 
@@ -7,12 +9,15 @@ import aiohttp
 import orjson
 import pytest
 import pytest_asyncio
-from aleph_message.models import Chain, ItemHash
+from aiohttp.test_utils import make_mocked_request
+from aleph_message.models import Chain, ItemHash, ItemType
 from in_memory_storage_engine import InMemoryStorageEngine
 
+import aleph.web.controllers.storage as storage_controllers
 from aleph.chains.signature_verifier import SignatureVerifier
 from aleph.db.accessors.files import get_file
 from aleph.db.models import AlephBalanceDb
+from aleph.schemas.message_content import ContentSource, RawContent
 from aleph.storage import StorageService
 from aleph.types.db_session import DbSessionFactory
 from aleph.types.files import FileType
@@ -270,6 +275,36 @@ async def test_storage_add_file_raw_upload(
     )
 
 
+@pytest.mark.asyncio
+async def test_storage_get_large_file_streamed(
+    api_client, session_factory: DbSessionFactory
+):
+    # Files above the threshold are streamed in chunks instead of sent in one body
+    file_content = bytes(range(256)) * (
+        storage_controllers.STREAM_RESPONSE_THRESHOLD // 256 + 1
+    )
+    assert len(file_content) > storage_controllers.STREAM_RESPONSE_THRESHOLD
+    file_hash = hashlib.sha256(file_content).hexdigest()
+
+    await add_file_raw_upload(
+        api_client,
+        session_factory,
+        uri=STORAGE_ADD_FILE_URI,
+        file_content=file_content,
+        expected_file_hash=file_hash,
+    )
+
+    get_file_response = await api_client.get(
+        f"{GET_STORAGE_RAW_URI}/{file_hash}", headers={"Accept-Encoding": "gzip"}
+    )
+    assert get_file_response.status == 200, await get_file_response.text()
+    assert get_file_response.content_type == "application/octet-stream"
+    assert get_file_response.headers["Content-Encoding"] == "gzip"
+    assert get_file_response.headers["Transfer-Encoding"] == "chunked"
+    assert "Content-Length" not in get_file_response.headers
+    assert await get_file_response.read() == file_content
+
+
 @pytest.mark.parametrize(
     "file_content, expected_hash, size, error_code, balance",
     [
@@ -376,6 +411,7 @@ async def add_json(
     # Assert that the JSON content is gettable
     get_json_response = await api_client.get(f"{GET_STORAGE_URI}/{file_hash}")
     assert get_json_response.status == 200
+    assert get_json_response.headers["Vary"] == "Accept"
 
     response_json = await get_json_response.json()
     assert response_json["status"] == "success"
@@ -383,6 +419,24 @@ async def add_json(
     assert response_json["engine"] == expected_file_hash.item_type.value
     assert base64.b64decode(response_json["content"]) == serialized_json
 
+    # Clients can ask for the raw bytes instead of the JSON wrapper
+    get_raw_json_response = await api_client.get(
+        f"{GET_STORAGE_URI}/{file_hash}",
+        headers={"Accept": "application/octet-stream"},
+    )
+    assert get_raw_json_response.status == 200
+    assert get_raw_json_response.headers["Vary"] == "Accept"
+    assert await get_raw_json_response.read() == serialized_json
+
+    # A q-value of 0 means the client does not want the raw bytes
+    get_refused_raw_json_response = await api_client.get(
+        f"{GET_STORAGE_URI}/{file_hash}",
+        headers={"Accept": "application/octet-stream;q=0"},
+    )
+    assert get_refused_raw_json_response.status == 200
+    assert get_refused_raw_json_response.content_type == "application/json"
+    assert (await get_refused_raw_json_response.json())["hash"] == file_hash
+
     # Assert that the corresponding file is downloadable
     get_file_response = await api_client.get(f"{GET_STORAGE_RAW_URI}/{file_hash}")
     assert get_file_response.status == 200
@@ -420,3 +474,91 @@ async def test_ipfs_add_json(api_client, session_factory: DbSessionFactory):
         # creating a second fixture.
         expected_file_hash=ItemHash(EXPECTED_FILE_CID),
     )
+
+
+@pytest.mark.parametrize(
+    "accept, expected_raw",
+    [
+        ("application/octet-stream", True),
+        ("application/octet-stream;q=0", False),
+        ("application/octet-stream; q=0.0, */*", False),
+        ("application/octet-stream;q=0.5", True),
+        ("application/octet-stream, application/json", False),
+        ("application/json;q=0.5, application/octet-stream", True),
+        ("application/json, application/octet-stream;q=0.9", False),
+        ("application/*", False),
+        ("*/*", False),
+        ("", False),
+    ],
+)
+def test_accepts_raw_content(accept: str, expected_raw: bool):
+    request = make_mocked_request(
+        "GET", f"{GET_STORAGE_URI}/{EXPECTED_FILE_SHA256}", headers={"Accept": accept}
+    )
+    assert storage_controllers._accepts_raw_content(request) is expected_raw
+
+
+@pytest.mark.asyncio
+async def test_get_file_content_cache(mocker):
+    mocker.patch.object(storage_controllers, "_file_content_cache", OrderedDict())
+    mocker.patch.object(storage_controllers, "_file_content_cache_size", 0)
+    mocker.patch.object(storage_controllers, "FILE_CONTENT_CACHE_SIZE", 10)
+
+    storage_service = mocker.AsyncMock()
+    storage_service.get_hash_content = mocker.AsyncMock(
+        side_effect=lambda item_hash, **kwargs: RawContent(
+            hash=item_hash, value=item_hash.encode() * 5, source=ContentSource.DB
+        )
+    )
+
+    for _ in range(2):
+        content = await storage_controllers._get_file_content(
+            storage_service=storage_service, item_hash="a", engine=ItemType.storage
+        )
+        assert content == b"aaaaa"
+    # The second read is served from the cache
+    assert storage_service.get_hash_content.await_count == 1
+
+    await storage_controllers._get_file_content(
+        storage_service=storage_service, item_hash="b", engine=ItemType.storage
+    )
+    await storage_controllers._get_file_content(
+        storage_service=storage_service, item_hash="c", engine=ItemType.storage
+    )
+    # The least recently used file is evicted to stay within the size budget
+    assert list(storage_controllers._file_content_cache) == ["b", "c"]
+    assert storage_controllers._file_content_cache_size == 10
+
+
+@pytest.mark.asyncio
+async def test_storage_add_json_big_int(api_client, session_factory: DbSessionFactory):
+    # Integers above 64 bits, ex: token amounts in wei, must be stored exactly
+    body = b'{"amount": 123456789012345678901234567890}'
+    expected_content = json.dumps({"amount": 123456789012345678901234567890}).encode()
+    expected_file_hash = hashlib.sha256(expected_content).hexdigest()
+
+    post_response = await api_client.post(
+        STORAGE_ADD_JSON_URI, data=body, headers={"Content-Type": "application/json"}
+    )
+    assert post_response.status == 200, await post_response.text()
+    post_response_json = await post_response.json()
+    assert post_response_json["hash"] == expected_file_hash
+
+    get_file_response = await api_client.get(
+        f"{GET_STORAGE_RAW_URI}/{expected_file_hash}"
+    )
+    assert get_file_response.status == 200, await get_file_response.text()
+    assert await get_file_response.read() == expected_content
+
+    with session_factory() as session:
+        file = get_file(session=session, file_hash=expected_file_hash)
+        assert file is not None
+        assert file.size == len(expected_content)
+
+
+@pytest.mark.asyncio
+async def test_storage_add_json_too_large(api_client, mocker):
+    mocker.patch.object(storage_controllers, "MAX_UNAUTHENTICATED_UPLOAD_FILE_SIZE", 16)
+
+    response = await api_client.post(STORAGE_ADD_JSON_URI, json={"data": "a" * 32})
+    assert response.status == 413, await response.text()
@@ -1,3 +1,4 @@
+import asyncio
 import datetime as dt
 
 import pytest
@@ -10,14 +11,20 @@ from aleph_message.models import (
     StoreContent,
 )
 
-from aleph.chains.chain_data_service import ChainDataService
+from aleph.chains.chain_data_service import (
+    ChainDataService,
+    _make_store_ipfs_item_content,
+)
 from aleph.db.models import ChainTxDb, MessageDb
+from aleph.exceptions import InvalidContent
 from aleph.schemas.chains.sync_events import OnChainSyncEventPayload
 from aleph.schemas.chains.tezos_indexer_response import MessageEventPayload
+from aleph.schemas.message_content import ContentSource, MessageContent
 from aleph.schemas.pending_messages import parse_message
 from aleph.toolkit.timestamp import timestamp_to_datetime
 from aleph.types.chain_sync import ChainSyncProtocol
 from aleph.types.db_session import DbSession, DbSessionFactory
+from aleph.utils import get_sha256
 
 
 @pytest.mark.asyncio
@@ -119,6 +126,42 @@ async def test_smart_contract_protocol_ipfs_store(
     assert message_content.time == payload.timestamp
 
 
+@pytest.mark.parametrize(
+    "address,time,ipfs_hash",
+    [
+        (
+            "KT1VBeLD7hzKpj17aRJ3Kc6QQFeikCEXi7W6",
+            1668611900,
+            "QmaMLRsvmDRCezZe2iebcKWtEzKNjBaQfwcu7mcpdm8eY2",
+        ),
+        (
+            "0x0dAd142fDD76A817CD52a700EaCA2D9D3491086B",
+            1697718147.2695966,
+            "bafybeigdyrzt5sfp7udm7hu76uh7y26nf3efuylqabf3oclgtqy55fbzdi",
+        ),
+    ],
+)
+def test_make_store_ipfs_item_content(address: str, time: float, ipfs_hash: str):
+    """
+    The item content of smart contract STORE messages is built by hand, check that it
+    matches the serialization of the pydantic model.
+    """
+
+    item_content, item_hash = _make_store_ipfs_item_content(
+        address=address, time=time, ipfs_hash=ipfs_hash
+    )
+
+    expected_content = StoreContent(
+        address=address,
+        time=time,
+        item_type=ItemType.ipfs,
+        item_hash=ItemHash(ipfs_hash),
+        metadata=None,
+    )
+    assert item_content == expected_content.json(exclude_none=True)
+    assert item_hash == get_sha256(expected_content.json(exclude_none=True))
+
+
 @pytest.mark.asyncio
 async def test_smart_contract_protocol_regular_message(
     mocker, session_factory: DbSessionFactory
@@ -178,3 +221,177 @@ async def test_smart_contract_protocol_regular_message(
     assert message_content.ref == content.ref
     assert message_content.type == content.type
     assert message_content.content == content.content
+
+
+@pytest.mark.asyncio
+async def test_iter_tx_messages(mocker):
+    sync_file_hash = "QmaMLRsvmDRCezZe2iebcKWtEzKNjBaQfwcu7mcpdm8eY2"
+    invalid_sync_file_hash = "QmPZ9gcCEpqKTo6aq61g2nXGUhM4iCL3ewB6LDXZCtioEB"
+    sync_messages = [{"item_hash": "1234", "type": "POST"}]
+
+    def make_tx(tx_hash: str, protocol: ChainSyncProtocol, content) -> ChainTxDb:
+        return ChainTxDb(
+            hash=tx_hash,
+            chain=Chain.ETH,
+            height=1234,
+            datetime=timestamp_to_datetime(1668611900),
+            publisher="0x0dAd142fDD76A817CD52a700EaCA2D9D3491086B",
+            protocol=protocol,
+            protocol_version=1,
+            content=content,
+        )
+
+    txs = [
+        make_tx("tx-1", ChainSyncProtocol.OFF_CHAIN_SYNC, sync_file_hash),
+        make_tx("tx-2", ChainSyncProtocol.OFF_CHAIN_SYNC, sync_file_hash),
+        make_tx(
+            "tx-3",
+            ChainSyncProtocol.ON_CHAIN_SYNC,
+            {"messages": [{"item_hash": "5678", "type": "STORE"}]},
+        ),
+        make_tx("tx-4", ChainSyncProtocol.ON_CHAIN_SYNC, {"messages": "not-a-list"}),
+        make_tx("tx-5", ChainSyncProtocol.OFF_CHAIN_SYNC, invalid_sync_file_hash),
+    ]
+
+    async def mock_get_json(content_hash: str, *args, **kwargs) -> MessageContent:
+        if content_hash == sync_file_hash:
+            value = {"content": {"messages": sync_messages}}
+        else:
+            value = {"messages": sync_messages}
+
+        return MessageContent(
+            hash=content_hash, source=ContentSource.IPFS, value=value, raw_value=b"{}"
+        )
+
+    storage_service = mocker.AsyncMock()
+    storage_service.get_json.side_effect = mock_get_json
+    chain_data_service = ChainDataService(
+        session_factory=mocker.MagicMock(), storage_service=storage_service
+    )
+    flush_file_pins = mocker.patch.object(chain_data_service, "_flush_file_pins")
+
+    results = {
+        tx.hash: result
+        async for tx, result in chain_data_service.iter_tx_messages(
+            txs, max_concurrency=2
+        )
+    }
+    assert results.keys() == {tx.hash for tx in txs}
+
+    # Each sync file is only fetched once, the duplicate tx returns no message
+    assert storage_service.get_json.call_count == 2
+    assert sorted([results["tx-1"], results["tx-2"]], key=len) == [[], sync_messages]
+
+    assert results["tx-3"] == txs[2].content["messages"]
+    assert isinstance(results["tx-4"], InvalidContent)
+    assert isinstance(results["tx-5"], InvalidContent)
+
+    # The file pins are inserted by the batch, not by each tx
+    flushed_file_pins = [
+        file_pin for call in flush_file_pins.call_args_list for file_pin in call.args[0]
+    ]
+    assert len(flushed_file_pins) == 1
+    assert flushed_file_pins[0][0] == sync_file_hash
+
+
+@pytest.mark.asyncio
+async def test_iter_tx_messages_file_pins_error(mocker):
+    sync_file_hash = "QmaMLRsvmDRCezZe2iebcKWtEzKNjBaQfwcu7mcpdm8eY2"
+    bad_sync_file_hash = "QmPZ9gcCEpqKTo6aq61g2nXGUhM4iCL3ewB6LDXZCtioEB"
+    sync_messages = [{"item_hash": "1234", "type": "POST"}]
+
+    txs = [
+        ChainTxDb(
+            hash=tx_hash,
+            chain=Chain.ETH,
+            height=1234,
+            datetime=timestamp_to_datetime(1668611900),
+            publisher="0x0dAd142fDD76A817CD52a700EaCA2D9D3491086B",
+            protocol=ChainSyncProtocol.OFF_CHAIN_SYNC,
+            protocol_version=1,
+            content=file_hash,
+        )
+        for tx_hash, file_hash in (
+            ("tx-1", sync_file_hash),
+            ("tx-2", bad_sync_file_hash),
+        )
+    ]
+
+    async def mock_get_json(content_hash: str, *args, **kwargs) -> MessageContent:
+        return MessageContent(
+            hash=content_hash,
+            source=ContentSource.IPFS,
+            value={"content": {"messages": sync_messages}},
+            raw_value=b"{}",
+        )
+
+    flushed_file_hashes = []
+
+    def mock_flush_file_pins(file_pins):
+        file_hashes = [file_hash for file_hash, _, _ in file_pins]
+        if bad_sync_file_hash in file_hashes:
+            raise ValueError("Bad file pin")
+        flushed_file_hashes.append(file_hashes)
+
+    storage_service = mocker.AsyncMock()
+    storage_service.get_json.side_effect = mock_get_json
+    chain_data_service = ChainDataService(
+        session_factory=mocker.MagicMock(), storage_service=storage_service
+    )
+    mocker.patch.object(
+        chain_data_service, "_flush_file_pins", side_effect=mock_flush_file_pins
+    )
+
+    results = {
+        tx.hash: result
+        async for tx, result in chain_data_service.iter_tx_messages(
+            txs, max_concurrency=2
+        )
+    }
+
+    # Only the tx with the failing file pin is reported as failed
+    assert results["tx-1"] == sync_messages
+    assert isinstance(results["tx-2"], ValueError)
+    assert flushed_file_hashes == [[sync_file_hash]]
+
+
+@pytest.mark.asyncio
+async def test_off_chain_protocol_does_not_wait_for_pin(mocker):
+    sync_file_hash = "QmaMLRsvmDRCezZe2iebcKWtEzKNjBaQfwcu7mcpdm8eY2"
+    sync_messages = [{"item_hash": "1234", "type": "POST"}]
+    pin_event = asyncio.Event()
+
+    async def mock_pin_hash(*args, **kwargs):
+        await pin_event.wait()
+
+    storage_service = mocker.AsyncMock()
+    storage_service.get_json.return_value = MessageContent(
+        hash=sync_file_hash,
+        source=ContentSource.IPFS,
+        value={"content": {"messages": sync_messages}},
+        raw_value=b"{}",
+    )
+    storage_service.pin_hash = mock_pin_hash
+    chain_data_service = ChainDataService(
+        session_factory=mocker.MagicMock(), storage_service=storage_service
+    )
+
+    tx = ChainTxDb(
+        hash="0x9b8a2b8a6a4e1e5e7bd2a7d2a4e3c8a1d1c0e1f5b0f7aa5f30e3d3c9cc87c81c",
+        chain=Chain.ETH,
+        height=1234,
+        datetime=timestamp_to_datetime(1668611900),
+        publisher="0x0dAd142fDD76A817CD52a700EaCA2D9D3491086B",
+        protocol=ChainSyncProtocol.OFF_CHAIN_SYNC,
+        protocol_version=1,
+        content=sync_file_hash,
+    )
+
+    messages = await asyncio.wait_for(chain_data_service.get_tx_messages(tx), 5)
+    assert messages == sync_messages
+
+    # The pin is still in progress in the background
+    assert len(chain_data_service._pin_tasks) == 1
+    pin_event.set()
+    await asyncio.gather(*chain_data_service._pin_tasks)
+    assert not chain_data_service._pin_tasks
@@ -6,11 +6,18 @@ import pytz
 
 from aleph.db.accessors.files import (
     get_file_tag,
+    get_files_by_refs,
     is_pinned_file,
     refresh_file_tag,
     upsert_file_tag,
 )
-from aleph.db.models import MessageFilePinDb, StoredFileDb, TxFilePinDb
+from aleph.db.models import (
+    ContentFilePinDb,
+    FileTagDb,
+    MessageFilePinDb,
+    StoredFileDb,
+    TxFilePinDb,
+)
 from aleph.types.db_session import DbSessionFactory
 from aleph.types.files import FileTag, FileType
 
@@ -164,3 +171,71 @@ async def test_refresh_file_tag(session_factory: DbSessionFactory):
         assert file_tag_db
         assert file_tag_db.file_hash == second_pin.file_hash
         assert file_tag_db.last_updated == second_pin.created
+
+
+@pytest.mark.asyncio
+async def test_get_files_by_refs(session_factory: DbSessionFactory):
+    tagged_file = StoredFileDb(
+        hash="QmTm7g1Mh3BhrQPjnedVQ5g67DR7cwhyMN3MvFt1JPPdWd",
+        size=32,
+        type=FileType.FILE,
+    )
+    pinned_file = StoredFileDb(
+        hash="QmTm7g1Mh3BhrQPjnedVQ5g67DR7cwhyMN3MvFt1JPPdWe",
+        size=413,
+        type=FileType.FILE,
+    )
+    tag = FileTag("aleph/custom-tag")
+    item_hash = "8f6f4b2a5ab4e2e2b89ae41f2c3d0a6c8491ab73e77b9d120e1a2a8b8d0c3b7a"
+    content_item_hash = (
+        "3a1f8e3f14f0d0d2bc0d7f76ac1bfc2715e6b3c882af1bb68ce4b5c7e9a20d1f"
+    )
+    created = pytz.utc.localize(dt.datetime(2020, 1, 1))
+
+    with session_factory() as session:
+        session.add_all([tagged_file, pinned_file])
+        session.flush()
+        session.add(
+            FileTagDb(
+                tag=tag,
+                owner="aleph",
+                file_hash=tagged_file.hash,
+                last_updated=created,
+            )
+        )
+        session.add(
+            MessageFilePinDb(
+                file_hash=pinned_file.hash,
+                owner="aleph",
+                item_hash=item_hash,
+                created=created,
+            )
+        )
+        # Content file pins also have an item hash, check that they are ignored
+        session.add(
+            ContentFilePinDb(
+                file_hash=tagged_file.hash,
+                owner="aleph",
+                item_hash=content_item_hash,
+                created=created,
+            )
+        )
+        session.commit()
+
+    with session_factory() as session:
+        assert get_files_by_refs(session=session, refs=[]) == {}
+
+        files = get_files_by_refs(
+            session=session,
+            refs=[
+                (tag, True),
+                (item_hash, False),
+                (content_item_hash, False),
+                ("aleph/unknown-tag", True),
+            ],
+        )
+        assert set(files.keys()) == {(tag, True), (item_hash, False)}
+        assert files[(tag, True)].hash == tagged_file.hash
+        assert files[(tag, True)].size == tagged_file.size
+        assert files[(item_hash, False)].hash == pinned_file.hash
+        assert files[(item_hash, False)].size == pinned_file.size
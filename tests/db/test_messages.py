@@ -4,6 +4,7 @@ from copy import copy
 import pytest
 import pytz
 from aleph_message.models import Chain, ItemHash, ItemType, MessageType
+from pydantic import ValidationError
 from sqlalchemy import insert, select, text
 
 from aleph.db.accessors.messages import (
@@ -13,12 +14,14 @@ from aleph.db.accessors.messages import (
     get_forgotten_message,
     get_message_by_item_hash,
     get_message_status,
+    get_unconfirmed_message_rows,
     get_unconfirmed_messages,
     make_confirmation_upsert_query,
     make_message_upsert_query,
     message_exists,
 )
 from aleph.db.models import ChainTxDb, MessageDb, MessageStatusDb, message_confirmations
+from aleph.db.models.messages import validate_message_content
 from aleph.toolkit.timestamp import timestamp_to_datetime
 from aleph.types.chain_sync import ChainSyncProtocol
 from aleph.types.channel import Channel
@@ -323,6 +326,34 @@ async def test_get_unconfirmed_messages_trusted_messages(
         assert unconfirmed_messages == []
 
 
+@pytest.mark.asyncio
+async def test_get_unconfirmed_message_rows(
+    session_factory: DbSessionFactory, fixture_message: MessageDb
+):
+    with session_factory() as session:
+        session.add(fixture_message)
+        session.commit()
+
+    with session_factory() as session:
+        rows = list(get_unconfirmed_message_rows(session, chain=Chain.ETH))
+        unconfirmed_messages = list(get_unconfirmed_messages(session, chain=Chain.ETH))
+
+        assert len(rows) == len(unconfirmed_messages) == 1
+        row, message = rows[0], unconfirmed_messages[0]
+        assert row.item_hash == message.item_hash
+        assert row.sender == message.sender
+        assert row.chain == message.chain
+        assert row.signature == message.signature
+        assert row.type == message.type
+        assert row.item_type == message.item_type
+        assert row.item_content == message.item_content
+        assert row.time == message.time
+        assert row.channel == message.channel
+
+        # Check that the limit parameter is respected
+        assert list(get_unconfirmed_message_rows(session, limit=0)) == []
+
+
 @pytest.mark.asyncio
 async def test_get_distinct_channels(
     session_factory: DbSessionFactory, fixture_message: MessageDb
@@ -414,3 +445,29 @@ async def test_forget_message(
             forget_message_hash,
             new_forget_message_hash,
         ]
+
+
+@pytest.mark.parametrize("time", [1664999873, -10.5, 253402300799.5])
+def test_validate_message_content_time(time: float):
+    content = validate_message_content(
+        MessageType.post,
+        {
+            "address": "0x51A58800b26AA1451aaA803d1746687cB88E0500",
+            "time": time,
+            "type": "test",
+        },
+    )
+    assert content.time == time
+
+
+@pytest.mark.parametrize("time", [1e15, -1e15, float("inf")])
+def test_validate_message_content_time_out_of_range(time: float):
+    with pytest.raises(ValidationError):
+        validate_message_content(
+            MessageType.post,
+            {
+                "address": "0x51A58800b26AA1451aaA803d1746687cB88E0500",
+                "time": time,
+                "type": "test",
+            },
+        )
@@ -7,6 +7,7 @@ from aleph_message.models import Chain, ItemType, MessageType
 from aleph.db.accessors.pending_messages import (
     count_pending_messages,
     get_next_pending_messages,
+    has_pending_messages,
 )
 from aleph.db.models import ChainTxDb, PendingMessageDb
 from aleph.types.chain_sync import ChainSyncProtocol
@@ -115,6 +116,20 @@ async def test_count_pending_messages(
         assert count_sol == 0
 
 
+@pytest.mark.asyncio
+async def test_has_pending_messages(
+    session_factory: DbSessionFactory, fixture_pending_messages: List[PendingMessageDb]
+):
+    with session_factory() as session:
+        assert not has_pending_messages(session=session)
+
+        session.add_all(fixture_pending_messages)
+        session.commit()
+
+    with session_factory() as session:
+        assert has_pending_messages(session=session)
+
+
 @pytest.mark.asyncio
 async def test_get_pending_messages(
     session_factory: DbSessionFactory, fixture_pending_messages: List[PendingMessageDb]
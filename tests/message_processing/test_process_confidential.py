@@ -1,8 +1,8 @@
 import datetime as dt
-import itertools
 import json
+from collections import defaultdict
 from decimal import Decimal
-from typing import List, Protocol, cast
+from typing import Dict, List, Protocol, cast
 
 import pytest
 import pytz
@@ -208,7 +208,7 @@ def insert_volume_refs(session: DbSession, message: PendingMessageDb):
             session.flush()
             insert_message_file_pin(
                 session=session,
-                file_hash=volume.ref[::-1],
+                file_hash=file_hash,
                 owner=content.address,
                 item_hash=volume.ref,
                 ref=None,
@@ -218,7 +218,7 @@ def insert_volume_refs(session: DbSession, message: PendingMessageDb):
                 session=session,
                 tag=FileTag(volume.ref),
                 owner=content.address,
-                file_hash=volume.ref[::-1],
+                file_hash=file_hash,
                 last_updated=created,
             )
 
@@ -279,13 +279,9 @@ async def test_process_confidential_vm(
 
         assert len(instance.volumes) == 5
 
-        volumes_by_type = {
-            type: list(volumes_iter)
-            for type, volumes_iter in itertools.groupby(
-                sorted(instance.volumes, key=lambda v: str(v.__class__)),
-                key=lambda v: v.__class__,
-            )
-        }
+        volumes_by_type: Dict[type, list] = defaultdict(list)
+        for volume in instance.volumes:
+            volumes_by_type[type(volume)].append(volume)
         assert len(volumes_by_type[EphemeralVolumeDb]) == 1
         assert len(volumes_by_type[PersistentVolumeDb]) == 3
         assert len(volumes_by_type[ImmutableVolumeDb]) == 1
@@ -1,8 +1,8 @@
 import datetime as dt
-import itertools
 import json
+from collections import defaultdict
 from decimal import Decimal
-from typing import List, Union
+from typing import Dict, List, Union
 
 import pytest
 import pytz
@@ -50,6 +50,9 @@ from aleph.types.db_session import DbSession, DbSessionFactory
 from aleph.types.files import FileTag, FileType
 from aleph.types.message_status import ErrorCode, MessageStatus
 
+PENDING_MESSAGE_NEXT_ATTEMPT = dt.datetime(2023, 1, 1)
+VOLUME_REFS_CREATED = pytz.utc.localize(dt.datetime(2023, 1, 1))
+
 
 @pytest.fixture
 def fixture_instance_message(session_factory: DbSessionFactory) -> PendingMessageDb:
@@ -134,7 +137,7 @@ def fixture_instance_message(session_factory: DbSessionFactory) -> PendingMessag
         fetched=True,
         check_message=False,
         retries=0,
-        next_attempt=dt.datetime(2023, 1, 1),
+        next_attempt=PENDING_MESSAGE_NEXT_ATTEMPT,
     )
     with session_factory() as session:
 
@@ -241,7 +244,7 @@ def fixture_instance_message_payg(
         fetched=True,
         check_message=False,
         retries=0,
-        next_attempt=dt.datetime(2023, 1, 1),
+        next_attempt=PENDING_MESSAGE_NEXT_ATTEMPT,
     )
     with session_factory() as session:
 
@@ -300,7 +303,7 @@ def fixture_forget_instance_message(
         fetched=True,
         check_message=False,
         retries=0,
-        next_attempt=dt.datetime(2023, 1, 1),
+        next_attempt=PENDING_MESSAGE_NEXT_ATTEMPT,
     )
     return pending_message
 
@@ -330,40 +333,49 @@ def get_volume_refs(
     return volumes
 
 
-def insert_volume_refs(session: DbSession, message: PendingMessageDb):
+def insert_volume_refs(
+    session: DbSession, message: PendingMessageDb
+) -> InstanceContent:
     """
     Insert volume references in the DB to make the program processable.
+    Returns the parsed content of the message.
     """
 
     assert message.item_content
     content = InstanceContent.parse_raw(message.item_content)
     volumes = get_volume_refs(content)
 
-    created = pytz.utc.localize(dt.datetime(2023, 1, 1))
+    # Note: we use the reversed ref to generate the file hash for style points,
+    # but it could be set to any valid hash.
+    file_hashes = {volume.ref: volume.ref[::-1] for volume in volumes}
 
-    for volume in volumes:
-        # Note: we use the reversed ref to generate the file hash for style points,
-        # but it could be set to any valid hash.
-        file_hash = volume.ref[::-1]
+    session.add_all(
+        [
+            StoredFileDb(hash=file_hash, size=1024 * 1024, type=FileType.FILE)
+            for file_hash in file_hashes.values()
+        ]
+    )
+    session.flush()
 
-        session.add(StoredFileDb(hash=file_hash, size=1024 * 1024, type=FileType.FILE))
-        session.flush()
+    for ref, file_hash in file_hashes.items():
         insert_message_file_pin(
             session=session,
-            file_hash=volume.ref[::-1],
+            file_hash=file_hash,
             owner=content.address,
-            item_hash=volume.ref,
+            item_hash=ref,
             ref=None,
-            created=created,
+            created=VOLUME_REFS_CREATED,
         )
         upsert_file_tag(
             session=session,
-            tag=FileTag(volume.ref),
+            tag=FileTag(ref),
             owner=content.address,
-            file_hash=volume.ref[::-1],
-            last_updated=created,
+            file_hash=file_hash,
+            last_updated=VOLUME_REFS_CREATED,
         )
 
+    return content
+
 
 @pytest.mark.asyncio
 async def test_process_instance(
@@ -427,13 +439,9 @@ async def test_process_instance(
         assert len(instance.volumes) == 5
         assert instance.node_hash is None
 
-        volumes_by_type = {
-            type: list(volumes_iter)
-            for type, volumes_iter in itertools.groupby(
-                sorted(instance.volumes, key=lambda v: str(v.__class__)),
-                key=lambda v: v.__class__,
-            )
-        }
+        volumes_by_type: Dict[type, list] = defaultdict(list)
+        for volume in instance.volumes:
+            volumes_by_type[type(volume)].append(volume)
         assert len(volumes_by_type[EphemeralVolumeDb]) == 1
         assert len(volumes_by_type[PersistentVolumeDb]) == 3
         assert len(volumes_by_type[ImmutableVolumeDb]) == 1
@@ -560,14 +568,12 @@ async def test_get_volume_size(
     fixture_instance_message: PendingMessageDb,
 ):
     with session_factory() as session:
-        insert_volume_refs(session, fixture_instance_message)
+        content = insert_volume_refs(session, fixture_instance_message)
         session.commit()
 
-    if fixture_instance_message.item_content:
-        content = InstanceContent.parse_raw(fixture_instance_message.item_content)
-        with session_factory() as session:
-            volume_size = get_volume_size(session=session, content=content)
-            assert volume_size == 21512585216
+    with session_factory() as session:
+        volume_size = get_volume_size(session=session, content=content)
+        assert volume_size == 21512585216
 
 
 @pytest.mark.asyncio
@@ -577,18 +583,16 @@ async def test_get_additional_storage_price(
     fixture_product_prices_aggregate_in_db,
 ):
     with session_factory() as session:
-        insert_volume_refs(session, fixture_instance_message)
+        content = insert_volume_refs(session, fixture_instance_message)
         session.commit()
 
-    if fixture_instance_message.item_content:
-        content = InstanceContent.parse_raw(fixture_instance_message.item_content)
-        with session_factory() as session:
-            pricing = _get_product_price(session, content)
+    with session_factory() as session:
+        pricing = _get_product_price(session, content)
 
-            additional_price = get_additional_storage_price(
-                content=content, pricing=pricing, session=session
-            )
-            assert additional_price == Decimal("1.8")
+        additional_price = get_additional_storage_price(
+            content=content, pricing=pricing, session=session
+        )
+        assert additional_price == Decimal("1.8")
 
 
 @pytest.mark.asyncio
@@ -598,14 +602,12 @@ async def test_get_compute_cost(
     fixture_product_prices_aggregate_in_db,
 ):
     with session_factory() as session:
-        insert_volume_refs(session, fixture_instance_message)
+        content = insert_volume_refs(session, fixture_instance_message)
         session.commit()
 
-    if fixture_instance_message.item_content:
-        content = InstanceContent.parse_raw(fixture_instance_message.item_content)
-        with session_factory() as session:
-            price: Decimal = compute_cost(content=content, session=session)
-            assert price == Decimal("1001.8")
+    with session_factory() as session:
+        price: Decimal = compute_cost(content=content, session=session)
+        assert price == Decimal("1001.8")
 
 
 @pytest.mark.asyncio
@@ -617,15 +619,13 @@ async def test_compare_cost_view_with_cost_function(
     fixture_product_prices_aggregate_in_db,
 ):
     with session_factory() as session:
-        insert_volume_refs(session, fixture_instance_message)
+        content = insert_volume_refs(session, fixture_instance_message)
         session.commit()
 
     pipeline = message_processor.make_pipeline()
     # Exhaust the iterator
     _ = [message async for message in pipeline]
 
-    assert fixture_instance_message.item_content
-    content = InstanceContent.parse_raw(fixture_instance_message.item_content)
     with session_factory() as session:
         cost_from_function: Decimal = compute_cost(session=session, content=content)
         cost_from_view = session.execute(
@@ -644,17 +644,13 @@ async def test_compare_cost_view_with_cost_function_payg(
     user_balance: AlephBalanceDb,
 ):
     with session_factory() as session:
-        insert_volume_refs(session, fixture_instance_message_payg)
+        content = insert_volume_refs(session, fixture_instance_message_payg)
         session.commit()
 
     pipeline = message_processor.make_pipeline()
     # Exhaust the iterator
     _ = [message async for message in pipeline]
 
-    assert fixture_instance_message_payg.item_content
-    content = InstanceContent.parse_raw(
-        fixture_instance_message_payg.item_content
-    )  # Parse again
     with session_factory() as session:
         assert content.payment.type == PaymentType.superfluid
         cost_from_view = session.execute(
@@ -716,7 +712,7 @@ def fixture_instance_message_only_rootfs(
         fetched=True,
         check_message=False,
         retries=0,
-        next_attempt=dt.datetime(2023, 1, 1),
+        next_attempt=PENDING_MESSAGE_NEXT_ATTEMPT,
     )
     with session_factory() as session:
 
@@ -742,17 +738,13 @@ async def test_compare_cost_view_with_cost_function_without_volume(
     fixture_product_prices_aggregate_in_db,
 ):
     with session_factory() as session:
-        insert_volume_refs(session, fixture_instance_message_only_rootfs)
+        content = insert_volume_refs(session, fixture_instance_message_only_rootfs)
         session.commit()
 
     pipeline = message_processor.make_pipeline()
     # Exhaust the iterator
     _ = [message async for message in pipeline]
 
-    assert fixture_instance_message_only_rootfs.item_content
-    content = InstanceContent.parse_raw(
-        fixture_instance_message_only_rootfs.item_content
-    )
     with session_factory() as session:
         cost_from_function: Decimal = compute_cost(session=session, content=content)
         cost_from_view = session.execute(
@@ -1,7 +1,8 @@
 import pytest
 from configmanager import Config
+from sqlalchemy import select
 
-from aleph.db.models import PendingMessageDb
+from aleph.db.models import PendingMessageDb, RejectedMessageDb
 from aleph.handlers.message_handler import MessagePublisher
 from aleph.storage import StorageService
 from aleph.toolkit.timestamp import utc_now
@@ -47,3 +48,46 @@ async def test_duplicated_pending_message(
     with session_factory() as session:
         pending_messages = session.query(PendingMessageDb).count()
         assert pending_messages == 1
+
+
+@pytest.mark.asyncio
+async def test_add_pending_messages(
+    mocker,
+    mock_config: Config,
+    session_factory: DbSessionFactory,
+    test_storage_service: StorageService,
+):
+    message = load_fixture_message("test-data-pending-messaging.json")
+    invalid_message = {**message, "item_hash": "1234", "type": "NOT-A-TYPE"}
+
+    message_publisher = MessagePublisher(
+        session_factory=session_factory,
+        storage_service=test_storage_service,
+        config=mock_config,
+        pending_message_exchange=mocker.AsyncMock(),
+    )
+
+    # Duplicates are only inserted once, invalid messages are rejected
+    pending_messages = await message_publisher.add_pending_messages(
+        message_dicts=[message, message, invalid_message],
+        reception_time=utc_now(),
+        origin=MessageOrigin.ONCHAIN,
+    )
+    assert len(pending_messages) == 1
+    assert pending_messages[0].item_hash == message["item_hash"]
+    assert pending_messages[0].id is not None
+
+    # Messages that are already pending are not inserted again
+    pending_messages = await message_publisher.add_pending_messages(
+        message_dicts=[message],
+        reception_time=utc_now(),
+        origin=MessageOrigin.ONCHAIN,
+    )
+    assert pending_messages == []
+
+    with session_factory() as session:
+        assert session.query(PendingMessageDb).count() == 1
+        rejected_message = session.execute(
+            select(RejectedMessageDb).where(RejectedMessageDb.item_hash == "1234")
+        ).scalar_one_or_none()
+        assert rejected_message is not None
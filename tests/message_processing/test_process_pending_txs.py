@@ -1,5 +1,6 @@
+import asyncio
 import datetime as dt
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 
 import pytest
 import pytz
@@ -11,6 +12,7 @@ from aleph.chains.chain_data_service import ChainDataService
 from aleph.db.models import MessageStatusDb, PendingMessageDb
 from aleph.db.models.chains import ChainTxDb
 from aleph.db.models.pending_txs import PendingTxDb
+from aleph.exceptions import ContentCurrentlyUnavailable
 from aleph.handlers.message_handler import MessagePublisher
 from aleph.jobs.process_pending_txs import PendingTxProcessor
 from aleph.schemas.chains.tezos_indexer_response import MessageEventPayload
@@ -26,7 +28,7 @@ from .load_fixtures import load_fixture_messages
 # TODO: try to replace this fixture by a get_json fixture. Currently, the pinning
 #       of the message content gets in the way in the real get_chaindata_messages function.
 async def get_fixture_chaindata_messages(
-    tx: ChainTxDb, seen_ids: List[str]
+    tx: ChainTxDb, seen_ids: Optional[Set[str]] = None, **kwargs
 ) -> List[Dict]:
     return load_fixture_messages(f"{tx.content}.json")
 
@@ -38,8 +40,12 @@ async def test_process_pending_tx_on_chain_protocol(
     session_factory: DbSessionFactory,
     test_storage_service: StorageService,
 ):
-    chain_data_service = mocker.AsyncMock()
-    chain_data_service.get_tx_messages = get_fixture_chaindata_messages
+    chain_data_service = ChainDataService(
+        session_factory=session_factory, storage_service=mocker.AsyncMock()
+    )
+    mocker.patch.object(
+        chain_data_service, "get_tx_messages", get_fixture_chaindata_messages
+    )
     pending_tx_processor = PendingTxProcessor(
         session_factory=session_factory,
         message_publisher=MessagePublisher(
@@ -70,10 +76,7 @@ async def test_process_pending_tx_on_chain_protocol(
         session.add(pending_tx)
         session.commit()
 
-    seen_ids: Set[str] = set()
-    await pending_tx_processor.handle_pending_tx(
-        pending_tx=pending_tx, seen_ids=seen_ids
-    )
+    await pending_tx_processor.process_pending_txs(max_concurrent_tasks=1)
 
     fixture_messages = load_fixture_messages(f"{pending_tx.tx.content}.json")
 
@@ -145,7 +148,7 @@ async def _process_smart_contract_tx(
         session.add(pending_tx)
         session.commit()
 
-    await pending_tx_processor.handle_pending_tx(pending_tx=pending_tx)
+    await pending_tx_processor.process_pending_txs(max_concurrent_tasks=1)
 
     with session_factory() as session:
         pending_txs = session.execute(select(PendingTxDb)).scalars().all()
@@ -224,3 +227,93 @@ async def test_process_pending_smart_contract_tx_post(
         test_storage_service=test_storage_service,
         payload=payload,
     )
+
+
+@pytest.mark.asyncio
+async def test_process_pending_txs_batch(
+    mocker,
+    mock_config: Config,
+    session_factory: DbSessionFactory,
+    test_storage_service: StorageService,
+):
+    def make_chain_tx(tx_hash: str, content: str) -> ChainTxDb:
+        return ChainTxDb(
+            hash=tx_hash,
+            chain=Chain.ETH,
+            datetime=pytz.utc.localize(dt.datetime.utcfromtimestamp(1632835747)),
+            height=13314512,
+            publisher="0x23eC28598DCeB2f7082Cc3a9D670592DfEd6e0dC",
+            protocol=ChainSyncProtocol.ON_CHAIN_SYNC,
+            protocol_version=1,
+            content=content,
+        )
+
+    valid_tx = make_chain_tx(
+        "0xf49cb176c1ce4f6eb7b9721303994b05074f8fadc37b5f41ac6f78bdf4b14b6c",
+        "test-data-pending-tx-messages",
+    )
+    unavailable_tx = make_chain_tx(
+        "0x2b8a1b6c1ce4f6eb7b9721303994b05074f8fadc37b5f41ac6f78bdf4b14b6d",
+        "unavailable-sync-file",
+    )
+    fixture_messages = load_fixture_messages(f"{valid_tx.content}.json")
+
+    sync_file_unavailable = asyncio.Event()
+
+    async def get_tx_messages(tx: ChainTxDb, **kwargs) -> List[Dict]:
+        if tx.hash == unavailable_tx.hash:
+            await sync_file_unavailable.wait()
+            raise ContentCurrentlyUnavailable("Sync file unavailable")
+        return fixture_messages
+
+    chain_data_service = ChainDataService(
+        session_factory=session_factory, storage_service=mocker.AsyncMock()
+    )
+    mocker.patch.object(chain_data_service, "get_tx_messages", get_tx_messages)
+    pending_tx_processor = PendingTxProcessor(
+        session_factory=session_factory,
+        message_publisher=MessagePublisher(
+            session_factory=session_factory,
+            storage_service=test_storage_service,
+            config=mock_config,
+            pending_message_exchange=mocker.AsyncMock(),
+        ),
+        chain_data_service=chain_data_service,
+        pending_tx_queue=mocker.AsyncMock(),
+    )
+
+    with session_factory() as session:
+        session.add(PendingTxDb(tx=valid_tx))
+        session.add(PendingTxDb(tx=unavailable_tx))
+        session.commit()
+
+    process_task = asyncio.create_task(
+        pending_tx_processor.process_pending_txs(max_concurrent_tasks=4)
+    )
+
+    # The valid tx is handled without waiting for the slow one
+    async def wait_for_valid_tx():
+        while True:
+            with session_factory() as session:
+                pending_tx_hashes = (
+                    session.execute(select(PendingTxDb.tx_hash)).scalars().all()
+                )
+            if valid_tx.hash not in pending_tx_hashes:
+                return
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(wait_for_valid_tx(), 5)
+    assert not process_task.done()
+
+    sync_file_unavailable.set()
+    await asyncio.wait_for(process_task, 5)
+
+    with session_factory() as session:
+        # The failing tx is kept to be retried later
+        pending_tx_hashes = session.execute(select(PendingTxDb.tx_hash)).scalars().all()
+        assert pending_tx_hashes == [unavailable_tx.hash]
+
+        pending_messages = session.execute(select(PendingMessageDb)).scalars().all()
+        assert {message.item_hash for message in pending_messages} == {
+            message["item_hash"] for message in fixture_messages
+        }
@@ -1,8 +1,8 @@
 import datetime as dt
-import itertools
 import json
+from collections import defaultdict
 from decimal import Decimal
-from typing import List
+from typing import Dict, List
 
 import pytest
 import pytz
@@ -131,7 +131,7 @@ def insert_volume_refs(session: DbSession, message: PendingMessageDb):
         session.flush()
         insert_message_file_pin(
             session=session,
-            file_hash=volume.ref[::-1],
+            file_hash=file_hash,
             owner=content.address,
             item_hash=volume.ref,
             ref=None,
@@ -142,7 +142,7 @@ def insert_volume_refs(session: DbSession, message: PendingMessageDb):
                 session=session,
                 tag=FileTag(volume.ref),
                 owner=content.address,
-                file_hash=volume.ref[::-1],
+                file_hash=file_hash,
                 last_updated=created,
             )
 
@@ -218,13 +218,9 @@ async def test_process_program(
 
         assert len(program.volumes) == 3
 
-        volumes_by_type = {
-            type: list(volumes_iter)
-            for type, volumes_iter in itertools.groupby(
-                sorted(program.volumes, key=lambda v: str(v.__class__)),
-                key=lambda v: v.__class__,
-            )
-        }
+        volumes_by_type: Dict[type, list] = defaultdict(list)
+        for volume in program.volumes:
+            volumes_by_type[type(volume)].append(volume)
         assert EphemeralVolumeDb not in volumes_by_type
         assert len(volumes_by_type[PersistentVolumeDb]) == 1
         assert len(volumes_by_type[ImmutableVolumeDb]) == 2
@@ -0,0 +1,101 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+
+import pytest
+
+from aleph.services.ipfs.pubsub import incoming_channel
+
+
+class MockIpfsService:
+    def __init__(self, messages: List[Dict[str, Any]]):
+        self.messages = messages
+        self.nb_received = 0
+
+    async def sub(self, topic: str):
+        for message in self.messages:
+            self.nb_received += 1
+            yield message
+
+        # Keep the subscription open, like a real one
+        await asyncio.Event().wait()
+
+
+def make_pubsub_messages(nb_messages: int) -> List[Dict[str, Any]]:
+    return [
+        {"data": json.dumps({"item_hash": f"{i:064x}"}).encode("utf-8")}
+        for i in range(nb_messages)
+    ]
+
+
+async def wait_for_tasks(nb_iterations: int = 20) -> None:
+    for _ in range(nb_iterations):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_incoming_channel_worker_survives_errors(mocker):
+    ipfs_service = MockIpfsService(make_pubsub_messages(3))
+    message_publisher = mocker.AsyncMock()
+    message_publisher.add_pending_message.side_effect = [
+        Exception("DB error"),
+        None,
+        None,
+    ]
+
+    channel_task = asyncio.create_task(
+        incoming_channel(
+            ipfs_service=ipfs_service,
+            topic="test",
+            message_publisher=message_publisher,
+            nb_workers=1,
+            queue_size=10,
+        )
+    )
+    await wait_for_tasks()
+
+    # The worker went on with the next messages after the first one failed
+    assert message_publisher.add_pending_message.await_count == 3
+
+    channel_task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await channel_task
+
+
+@pytest.mark.asyncio
+async def test_incoming_channel_backpressure(mocker):
+    nb_workers = 2
+    queue_size = 3
+    ipfs_service = MockIpfsService(make_pubsub_messages(10))
+
+    unblock_workers = asyncio.Event()
+
+    async def add_pending_message(**kwargs):
+        await unblock_workers.wait()
+
+    message_publisher = mocker.AsyncMock()
+    message_publisher.add_pending_message.side_effect = add_pending_message
+
+    channel_task = asyncio.create_task(
+        incoming_channel(
+            ipfs_service=ipfs_service,
+            topic="test",
+            message_publisher=message_publisher,
+            nb_workers=nb_workers,
+            queue_size=queue_size,
+        )
+    )
+    await wait_for_tasks()
+
+    # One message per busy worker, a full queue and the message waiting to be queued
+    assert ipfs_service.nb_received == nb_workers + queue_size + 1
+    assert message_publisher.add_pending_message.await_count == nb_workers
+
+    unblock_workers.set()
+    await wait_for_tasks()
+    assert ipfs_service.nb_received == 10
+    assert message_publisher.add_pending_message.await_count == 10
+
+    channel_task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await channel_task
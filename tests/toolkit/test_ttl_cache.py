@@ -0,0 +1,52 @@
+import pytest
+
+from aleph.toolkit.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def mock_monotonic(mocker):
+    mock_time = mocker.patch("aleph.toolkit.ttl_cache.time")
+    mock_time.monotonic.return_value = 1000.0
+    return mock_time.monotonic
+
+
+def test_ttl_cache_hit(mock_monotonic):
+    cache: TTLCache[str, int] = TTLCache(ttl=10, max_size=10)
+    cache.set("a", 1)
+
+    mock_monotonic.return_value += 9
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+
+def test_ttl_cache_expiry(mock_monotonic):
+    cache: TTLCache[str, int] = TTLCache(ttl=10, max_size=10)
+    cache.set("a", 1)
+
+    mock_monotonic.return_value += 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_eviction(mock_monotonic):
+    cache: TTLCache[str, int] = TTLCache(ttl=10, max_size=3)
+    for i, key in enumerate(("a", "b", "c")):
+        cache.set(key, i)
+
+    # Updating an entry moves it to the end of the eviction order
+    cache.set("a", 10)
+    cache.set("d", 3)
+
+    assert len(cache) == 3
+    assert cache.get("b") is None
+    assert cache.get("a") == 10
+    assert cache.get("c") == 2
+    assert cache.get("d") == 3
+
+
+def test_ttl_cache_clear():
+    cache: TTLCache[str, int] = TTLCache(ttl=10, max_size=10)
+    cache.set("a", 1)
+    cache.clear()
+
+    assert cache.get("a") is None